@@ -0,0 +1,24 @@
+"""Add composite index on aceptaciones(evento_id, fecha_hora DESC, id).
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_aceptaciones_evento_fecha "
+        "ON aceptaciones(evento_id, fecha_hora DESC, id);"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_aceptaciones_evento_fecha;")
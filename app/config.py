@@ -8,6 +8,9 @@ Variables opcionales (con valores por defecto para desarrollo):
   - ADMIN_USER              (default: "admin")
   - ENCARRERAOK_DB_PATH     (default: "/var/lib/encarreraok/encarreraok.sqlite3")
   - ENCARRERAOK_LEGAL_DIR   (default: "legal")
+  - ENCARRERAOK_JINJA_CACHE_DIR (default: "/var/cache/encarreraok/jinja")
+  - ENCARRERAOK_EVIDENCIAS_ACCEL_PREFIX (default: "" — deshabilitado)
+  - ENCARRERAOK_THREADPOOL_SIZE (default: 40)
 
 Variables opcionales para email (Mailgun):
   - MAILGUN_API_KEY
@@ -36,6 +39,21 @@ class Settings:
     # Directorio de archivos legales (textos de deslinde)
     legal_dir: str = os.environ.get("ENCARRERAOK_LEGAL_DIR", "legal")
 
+    # Cache de bytecode de templates Jinja2 (compartido entre workers)
+    jinja_cache_dir: str = os.environ.get(
+        "ENCARRERAOK_JINJA_CACHE_DIR",
+        "/var/cache/encarreraok/jinja",
+    )
+
+    # Prefijo de la location interna de Nginx para servir evidencias vía
+    # X-Accel-Redirect (ej. "/_evidencias/"). Vacío: la app sirve el archivo.
+    evidencias_accel_prefix: str = os.environ.get("ENCARRERAOK_EVIDENCIAS_ACCEL_PREFIX", "")
+
+    # Threads para los handlers sync (def) de FastAPI, por worker. Cada envío
+    # ocupa uno mientras sube y comprime evidencias: con muchos envíos
+    # simultáneos conviene subirlo (default de anyio: 40).
+    threadpool_size: int = int(os.environ.get("ENCARRERAOK_THREADPOOL_SIZE", "40"))
+
     # Mailgun (opcional — si no se configura, el envío de emails se omite)
     mailgun_api_key: str = os.environ.get("MAILGUN_API_KEY", "")
     mailgun_domain: str = os.environ.get("MAILGUN_DOMAIN", "")
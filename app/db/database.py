@@ -1,7 +1,12 @@
 import sqlite3
 import os
+import atexit
 import logging
-from typing import Union, Any, List
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from queue import LifoQueue, Empty, Full
+from typing import Union, Any, List, Iterator
 
 # Configuración de logger
 logger = logging.getLogger(__name__)
@@ -22,6 +27,29 @@ DEFAULT_DB_PATH = "/var/lib/encarreraok/encarreraok.sqlite3"
 DB_PATH = os.environ.get("ENCARRERAOK_DB_PATH", DEFAULT_DB_PATH)
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
+# Tamaño del pool de conexiones SQLite (conexiones ociosas retenidas)
+SQLITE_POOL_SIZE = 8
+
+# Sentencias preparadas retenidas por conexión del pool
+SQLITE_CACHED_STATEMENTS = 256
+
+# Espera máxima (s) del busy handler de SQLite ante una base bloqueada por otro
+# escritor. Es el timeout por defecto de sqlite3.connect (equivale a
+# PRAGMA busy_timeout=5000); se pasa explícito para no depender del default.
+SQLITE_BUSY_TIMEOUT_S = 5.0
+
+# PRAGMAs aplicados una sola vez al abrir cada conexión del pool
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    # Mismo comportamiento que PostgreSQL: SQLite no valida FOREIGN KEY salvo
+    # que se active por conexión
+    "PRAGMA foreign_keys=ON",
+)
+
 def is_postgres_connection(conn: Any) -> bool:
     if not PSYCOPG_AVAILABLE:
         return False
@@ -46,19 +74,25 @@ def sql_placeholders(count: int, conn: Any = None) -> str:
     p = sql_param(conn)
     return ", ".join([p] * count)
 
+@lru_cache(maxsize=512)
+def _sql_sqlite(sql: str) -> str:
+    """Traduce los placeholders %s a ? (una vez por sentencia distinta)."""
+    return sql.replace("%s", "?")
+
+
 class _SQLiteCompatCursor:
     """Cursor SQLite que acepta %s como placeholder (igual que PostgreSQL)."""
     def __init__(self, cursor):
         self._cur = cursor
 
     def execute(self, sql, params=None):
-        sql = sql.replace("%s", "?")
+        sql = _sql_sqlite(sql)
         if params is None:
             return self._cur.execute(sql)
         return self._cur.execute(sql, params)
 
     def executemany(self, sql, seq):
-        sql = sql.replace("%s", "?")
+        sql = _sql_sqlite(sql)
         return self._cur.executemany(sql, seq)
 
     def fetchone(self):
@@ -80,9 +114,13 @@ class _SQLiteCompatCursor:
 
 
 class _SQLiteCompatConnection:
-    """Conexión SQLite que devuelve cursores compatibles con %s."""
-    def __init__(self, conn):
+    """
+    Conexión SQLite que devuelve cursores compatibles con %s.
+    Si proviene del pool, close() la devuelve al pool en lugar de cerrarla.
+    """
+    def __init__(self, conn, pool: "SQLitePool" = None):
         self._conn = conn
+        self._pool = pool
         self.row_factory = conn.row_factory
 
     def cursor(self):
@@ -95,7 +133,12 @@ class _SQLiteCompatConnection:
         return self._conn.rollback()
 
     def close(self):
-        return self._conn.close()
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return None
+        if self._pool is not None:
+            return self._pool.release(conn)
+        return conn.close()
 
     def __enter__(self):
         return self
@@ -104,10 +147,91 @@ class _SQLiteCompatConnection:
         self._conn.__exit__(*args)
 
 
+class SQLitePool:
+    """
+    Pool mínimo y thread-safe de conexiones SQLite.
+
+    Las conexiones se abren bajo demanda (con sus PRAGMAs) y se reutilizan
+    entre requests, manteniendo caliente el cache de páginas de cada una.
+    Se retienen como máximo `size` conexiones ociosas; las sobrantes se cierran.
+    """
+    def __init__(self, path: str, size: int = SQLITE_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._q: LifoQueue = LifoQueue(maxsize=size)
+
+    def _make(self) -> sqlite3.Connection:
+        # Cache de sentencias preparadas por conexión: las consultas del sistema
+        # son texto fijo (constantes), así que se parsean una vez por conexión
+        conn = sqlite3.connect(
+            self.path,
+            timeout=SQLITE_BUSY_TIMEOUT_S,
+            check_same_thread=False,
+            cached_statements=SQLITE_CACHED_STATEMENTS,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def get(self) -> sqlite3.Connection:
+        try:
+            return self._q.get_nowait()
+        except Empty:
+            return self._make()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        try:
+            # No devolver al pool una transacción a medio terminar
+            if conn.in_transaction:
+                conn.rollback()
+            self._q.put_nowait(conn)
+        except (Full, sqlite3.Error):
+            conn.close()
+
+    def close_all(self) -> None:
+        """Cierra las conexiones ociosas (al cerrar la última, SQLite hace checkpoint del WAL)."""
+        while True:
+            try:
+                conn = self._q.get_nowait()
+            except Empty:
+                return
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    @contextmanager
+    def acquire(self) -> Iterator["_SQLiteCompatConnection"]:
+        conn = _SQLiteCompatConnection(self.get(), self)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+_sqlite_pools: dict = {}
+_sqlite_pools_lock = threading.Lock()
+
+
+def get_sqlite_pool(path: str = None) -> SQLitePool:
+    """Devuelve (creando si hace falta) el pool asociado a la ruta de la base."""
+    path = path or DB_PATH
+    pool = _sqlite_pools.get(path)
+    if pool is None:
+        with _sqlite_pools_lock:
+            pool = _sqlite_pools.get(path)
+            if pool is None:
+                pool = _sqlite_pools[path] = SQLitePool(path)
+                atexit.register(pool.close_all)
+    return pool
+
+
 def get_connection() -> Union[sqlite3.Connection, Any]:
     """
-    Crea una conexión a la base de datos.
-    Soporta SQLite (por defecto) y PostgreSQL (si DATABASE_URL está definido).
+    Obtiene una conexión a la base de datos.
+    Soporta SQLite (por defecto, desde el pool) y PostgreSQL (si DATABASE_URL está definido).
+    Llamar siempre a close(): en SQLite devuelve la conexión al pool.
     """
     # 1. Detectar si se debe usar PostgreSQL
     if is_postgres_configured():
@@ -118,18 +242,61 @@ def get_connection() -> Union[sqlite3.Connection, Any]:
             conn = psycopg.connect(DATABASE_URL, row_factory=dict_row)
             return conn
         except Exception as e:
-            logger.error(f"Error conectando a PostgreSQL: {e}")
+            logger.error("Error conectando a PostgreSQL: %s", e)
             raise
 
-    # 2. Fallback a SQLite — envuelto para aceptar %s como placeholder
+    # 2. Fallback a SQLite — conexión del pool, envuelta para aceptar %s
     try:
-        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        return _SQLiteCompatConnection(conn)
+        pool = get_sqlite_pool()
+        return _SQLiteCompatConnection(pool.get(), pool)
     except Exception as e:
-        logger.error(f"Error conectando a SQLite en {DB_PATH}: {e}")
+        logger.error("Error conectando a SQLite en %s: %s", DB_PATH, e)
         raise
 
+
+@contextmanager
+def db_connection() -> Iterator[Any]:
+    """
+    get_connection() para usar con `with`: cierra la conexión al salir del
+    bloque (en SQLite la devuelve al pool), aun si hubo excepción.
+    """
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+# Un único escritor SQLite por proceso (se despliega con --workers 1)
+_sqlite_escritura_lock = threading.Lock()
+
+
+@contextmanager
+def escritura_sqlite(conn: Any) -> Iterator[None]:
+    """
+    Transacción de escritura serializada: en SQLite toma un Lock del proceso y
+    abre con BEGIN IMMEDIATE. Los threads que esperan se despiertan apenas se
+    libera el Lock, en lugar de reintentar con el busy handler de SQLite (que
+    duerme con backoff). Todas las escrituras de los routers (public, admin y
+    operator) pasan por acá. El bloque debe hacer commit; si sale con excepción
+    se hace rollback. En PostgreSQL solo hace el rollback ante error.
+    """
+    if is_postgres_connection(conn):
+        try:
+            yield
+        except BaseException:
+            conn.rollback()
+            raise
+        return
+    with _sqlite_escritura_lock:
+        conn.cursor().execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.rollback()
+            raise
+
+
 def get_table_columns(conn: Union[sqlite3.Connection, Any], table_name: str) -> List[str]:
     """
     Obtiene la lista de nombres de columnas de una tabla.
@@ -160,5 +327,5 @@ def get_table_columns(conn: Union[sqlite3.Connection, Any], table_name: str) ->
             # PRAGMA devuelve: cid, name, type, notnull, dflt_value, pk
             return [row['name'] for row in rows]
     except Exception as e:
-        logger.error(f"Error obteniendo columnas de tabla {table_name}: {e}")
+        logger.error("Error obteniendo columnas de tabla %s: %s", table_name, e)
         return []
@@ -47,13 +47,13 @@ def _send(to: str, subject: str, html: str, text: str) -> bool:
         with urllib.request.urlopen(req, timeout=10) as resp:
             status = resp.status
             if status == 200:
-                logger.info(f"Email enviado a {to}: {subject}")
+                logger.info("Email enviado a %s: %s", to, subject)
                 return True
             else:
-                logger.warning(f"Mailgun respondió {status} para {to}")
+                logger.warning("Mailgun respondió %s para %s", status, to)
                 return False
     except Exception as e:
-        logger.error(f"Error enviando email a {to}: {e}")
+        logger.error("Error enviando email a %s: %s", to, e)
         return False
 
 
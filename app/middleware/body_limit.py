@@ -0,0 +1,65 @@
+"""
+Middleware ASGI que limita el tamaño del body de los requests.
+
+Rechaza con 413 apenas llega el header Content-Length si supera el máximo,
+sin leer el body. Para requests sin Content-Length (chunked) cuenta los
+bytes a medida que se reciben y corta al superar el límite.
+"""
+
+import json
+
+from fastapi import HTTPException
+
+
+class BodyLimitMiddleware:
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = None
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    content_length = None
+                break
+
+        if content_length is not None and content_length > self.max_bytes:
+            await self._rechazar(send)
+            return
+
+        recibidos = 0
+        max_bytes = self.max_bytes
+
+        async def receive_limitado():
+            nonlocal recibidos
+            message = await receive()
+            if message["type"] == "http.request":
+                recibidos += len(message.get("body", b""))
+                if recibidos > max_bytes:
+                    raise HTTPException(status_code=413, detail="El envío supera el tamaño máximo permitido.")
+            return message
+
+        await self.app(scope, receive_limitado, send)
+
+    async def _rechazar(self, send) -> None:
+        body = json.dumps(
+            {"detail": "El envío supera el tamaño máximo permitido."},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
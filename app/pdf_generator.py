@@ -10,6 +10,7 @@ import struct
 import hashlib
 import logging
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 
 app_logger = logging.getLogger('encarreraok')
@@ -33,6 +34,16 @@ DESLINDES_CONFIG = {
 DEFAULT_DESLINDE_VERSION = "v1_1"
 
 
+@lru_cache(maxsize=8)
+def _leer_deslinde(path: str) -> str:
+    """
+    Lee un archivo legal una vez por proceso (para ver cambios, reiniciar).
+    Si falla no queda cacheado: lru_cache no guarda excepciones.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
 def cargar_deslinde(version: str = DEFAULT_DESLINDE_VERSION) -> str:
     """
     Carga el texto del deslinde desde archivo según la versión.
@@ -40,15 +51,14 @@ def cargar_deslinde(version: str = DEFAULT_DESLINDE_VERSION) -> str:
     """
     filename = DESLINDES_CONFIG.get(version)
     if not filename:
-        app_logger.error(f"Versión de deslinde desconocida: {version}, usando default")
+        app_logger.error("Versión de deslinde desconocida: %s, usando default", version)
         filename = DESLINDES_CONFIG[DEFAULT_DESLINDE_VERSION]
 
     path = os.path.join(LEGAL_DIR, filename)
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return f.read()
+        return _leer_deslinde(path)
     except Exception as e:
-        app_logger.error(f"Error leyendo archivo de deslinde {path}: {e}")
+        app_logger.error("Error leyendo archivo de deslinde %s: %s", path, e)
         return """DESLINDE DE RESPONSABILIDAD Y ACEPTACIÓN DE RIESGOS
 
 Declaro que participo en el evento deportivo {{NOMBRE_EVENTO}}, organizado por {{ORGANIZADOR}}, de manera voluntaria y bajo mi exclusiva responsabilidad.
@@ -64,6 +74,15 @@ Autorizo la utilización de mi imagen, voz y datos personales con fines de difus
 Declaro haber leído, comprendido y aceptado íntegramente el presente deslinde de responsabilidad."""
 
 
+def precargar_deslindes() -> None:
+    """
+    Lee al arrancar todos los textos legales configurados (quedan en el cache
+    de _leer_deslinde): el primer request de cada versión no paga la lectura.
+    """
+    for version in DESLINDES_CONFIG:
+        cargar_deslinde(version)
+
+
 def calcular_hash_sha256(texto: str) -> str:
     """Calcula SHA256 en hex del texto provisto."""
     return hashlib.sha256(texto.encode("utf-8")).hexdigest()
@@ -499,7 +518,7 @@ class SimplePDFGenerator:
 def _generar_bytes_pdf(aceptacion: Dict[str, Any], evento: Dict[str, Any]) -> bytes:
     """Helper para generar el PDF legal de una aceptación."""
     # Reconstruir texto deslinde
-    version = evento.get("deslinde_version") or DEFAULT_DESLINDE_VERSION
+    version = evento["deslinde_version"] or DEFAULT_DESLINDE_VERSION
     texto_base = cargar_deslinde(version)
     texto_final = texto_base.replace("{{NOMBRE_EVENTO}}", evento["nombre"])\
                             .replace("{{ORGANIZADOR}}", evento["organizador"])
@@ -511,8 +530,8 @@ def _generar_bytes_pdf(aceptacion: Dict[str, Any], evento: Dict[str, Any]) -> by
 
     if consistencia != "OK":
         app_logger.warning(
-            f"Inconsistencia de hash detectada - AceptacionID: {aceptacion['id']}, "
-            f"EventoID: {evento['id']}. BD: {hash_bd}, Calc: {hash_calculado}"
+            "Inconsistencia de hash detectada - AceptacionID: %s, EventoID: %s. BD: %s, Calc: %s",
+            aceptacion['id'], evento['id'], hash_bd, hash_calculado,
         )
 
     # Generar PDF
@@ -20,7 +20,7 @@ Endpoints:
   POST /admin/aceptaciones/{id}/revocar_token - Revocar token PDF
   GET  /admin/evento/{id}/monitor           - Monitor de entrada
   GET  /admin/evento/{id}/preview/{acep_id} - Vista previa evidencias
-  GET  /admin/evidencia/{id}/{tipo}         - Servir evidencia (streaming)
+  GET  /admin/evidencia/{id}/{tipo}         - Servir evidencia (FileResponse / thumbnail)
   GET  /admin/evidence/view/{id}/{tipo}     - Visualizar evidencia (FileResponse)
 """
 
@@ -32,14 +32,16 @@ import hashlib
 import logging
 import sqlite3
 from datetime import datetime, date
+from html import escape
 from typing import Optional, List, Any, Dict
 
 from fastapi import APIRouter, Request, Form, HTTPException, Depends
-from fastapi.responses import HTMLResponse, StreamingResponse, FileResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, StreamingResponse, RedirectResponse, Response
 
 from app.middleware.auth import get_current_username
 from app.config import settings
-from app.templates_config import templates_env
+from app.templates_config import TEMPLATES
+from app.utils import ahora_utc_iso, marcar_evidencias_existentes, respuesta_evidencia
 from app.pdf_generator import (
     _generar_bytes_pdf,
     cargar_deslinde,
@@ -58,6 +60,20 @@ except ImportError:
 
 router = APIRouter(prefix="/admin", dependencies=[Depends(get_current_username)])
 
+# Templates usados por este router, resueltos una vez al importar
+_TPL_ADMIN_ACEPTACION_DETALLE = TEMPLATES["admin_aceptacion_detalle.html"]
+_TPL_ADMIN_ACEPTACIONES = TEMPLATES["admin_aceptaciones.html"]
+_TPL_ADMIN_BUSQUEDA_DESLINDES = TEMPLATES["admin_busqueda_deslindes.html"]
+_TPL_ADMIN_EVENTOS_FORM = TEMPLATES["admin_eventos_form.html"]
+_TPL_ADMIN_EVENTOS_LISTA = TEMPLATES["admin_eventos_lista.html"]
+_TPL_ADMIN_GESTION_ELIMINACION = TEMPLATES["admin_gestion_eliminacion.html"]
+_TPL_ADMIN_MONITOR_EVENTO = TEMPLATES["admin_monitor_evento.html"]
+_TPL_ADMIN_OPERADORES = TEMPLATES["admin_operadores.html"]
+_TPL_ADMIN_PREVIEW = TEMPLATES["admin_preview.html"]
+
+# Filas por página en el listado general de aceptaciones
+ADMIN_ACEPTACIONES_PAGE_SIZE = 100
+
 # Directorios de almacenamiento
 DB_PATH = settings.db_path
 
@@ -68,13 +84,18 @@ def _get_connection():
     return _db_get_connection()
 
 
+def _escritura_sqlite(conn):
+    """Transacción de escritura serializada (ver app.db.database.escritura_sqlite)."""
+    from app.db.database import escritura_sqlite
+    return escritura_sqlite(conn)
+
+
 def _generar_recarga_token(conn, aceptacion_id: int, horas: int = 72) -> str:
     """Genera y guarda un token de re-carga válido por `horas` horas. Retorna el token."""
     import secrets
-    from datetime import timedelta
     from app.db.database import sql_placeholders
     token = secrets.token_urlsafe(32)
-    expires_at = (datetime.utcnow() + timedelta(hours=horas)).replace(microsecond=0).isoformat() + "Z"
+    expires_at = ahora_utc_iso(horas * 3600)
     cur = conn.cursor()
     cur.execute(
         f"UPDATE aceptaciones SET recarga_token = {sql_placeholders(1, conn)}, "
@@ -88,7 +109,7 @@ def _generar_recarga_token(conn, aceptacion_id: int, horas: int = 72) -> str:
 def _log_historial(conn, aceptacion_id: int, evento_id: int, accion: str, realizado_por: str, detalle: str = None):
     """Inserta una entrada en aceptaciones_historial."""
     from app.db.database import sql_placeholders
-    fecha = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    fecha = ahora_utc_iso()
     try:
         cur = conn.cursor()
         cur.execute(
@@ -97,7 +118,7 @@ def _log_historial(conn, aceptacion_id: int, evento_id: int, accion: str, realiz
             (aceptacion_id, evento_id, accion, realizado_por, fecha, detalle),
         )
     except Exception as e:
-        app_logger.warning(f"No se pudo registrar historial: {e}")
+        app_logger.warning("No se pudo registrar historial: %s", e)
 
 
 def get_evento(evento_id: int) -> Optional[Dict[str, Any]]:
@@ -140,23 +161,24 @@ def crear_evento(
     conn = _get_connection()
     try:
         from app.db.database import sql_placeholders, is_postgres_connection
-        cur = conn.cursor()
-        ph = sql_placeholders(10, conn)
-        if is_postgres_connection(conn):
-            cur.execute(
-                f"INSERT INTO eventos (nombre, fecha, organizador, activo, req_firma, req_documento, req_salud, req_audio, deslinde_version, friendly_intro) VALUES ({ph}) RETURNING id",
-                (nombre, fecha, organizador, activo, req_firma, req_documento, req_salud, req_audio, deslinde_version, friendly_intro)
-            )
-            row = cur.fetchone()
-            evento_id = row['id'] if row else None
-        else:
-            cur.execute(
-                f"INSERT INTO eventos (nombre, fecha, organizador, activo, req_firma, req_documento, req_salud, req_audio, deslinde_version, friendly_intro) VALUES ({ph})",
-                (nombre, fecha, organizador, activo, req_firma, req_documento, req_salud, req_audio, deslinde_version, friendly_intro)
-            )
-            evento_id = cur.lastrowid
-        conn.commit()
-        app_logger.info(f"Evento creado: id={evento_id}, nombre={nombre}")
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            ph = sql_placeholders(10, conn)
+            if is_postgres_connection(conn):
+                cur.execute(
+                    f"INSERT INTO eventos (nombre, fecha, organizador, activo, req_firma, req_documento, req_salud, req_audio, deslinde_version, friendly_intro) VALUES ({ph}) RETURNING id",
+                    (nombre, fecha, organizador, activo, req_firma, req_documento, req_salud, req_audio, deslinde_version, friendly_intro)
+                )
+                row = cur.fetchone()
+                evento_id = row['id'] if row else None
+            else:
+                cur.execute(
+                    f"INSERT INTO eventos (nombre, fecha, organizador, activo, req_firma, req_documento, req_salud, req_audio, deslinde_version, friendly_intro) VALUES ({ph})",
+                    (nombre, fecha, organizador, activo, req_firma, req_documento, req_salud, req_audio, deslinde_version, friendly_intro)
+                )
+                evento_id = cur.lastrowid
+            conn.commit()
+        app_logger.info("Evento creado: id=%s, nombre=%s", evento_id, nombre)
         return evento_id
     finally:
         conn.close()
@@ -179,56 +201,93 @@ def actualizar_evento(
     conn = _get_connection()
     try:
         from app.db.database import sql_placeholders
-        cur = conn.cursor()
-        ph = sql_placeholders(1, conn)
-        cur.execute(
-            f"UPDATE eventos SET nombre={ph}, fecha={ph}, organizador={ph}, activo={ph}, "
-            f"req_firma={ph}, req_documento={ph}, req_salud={ph}, req_audio={ph}, "
-            f"deslinde_version={ph}, friendly_intro={ph} WHERE id={ph}",
-            (nombre, fecha, organizador, activo, req_firma, req_documento, req_salud, req_audio, deslinde_version, friendly_intro, evento_id)
-        )
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            ph = sql_placeholders(1, conn)
+            cur.execute(
+                f"UPDATE eventos SET nombre={ph}, fecha={ph}, organizador={ph}, activo={ph}, "
+                f"req_firma={ph}, req_documento={ph}, req_salud={ph}, req_audio={ph}, "
+                f"deslinde_version={ph}, friendly_intro={ph} WHERE id={ph}",
+                (nombre, fecha, organizador, activo, req_firma, req_documento, req_salud, req_audio, deslinde_version, friendly_intro, evento_id)
+            )
+            conn.commit()
         if cur.rowcount > 0:
-            app_logger.info(f"Evento actualizado: id={evento_id}")
+            app_logger.info("Evento actualizado: id=%s", evento_id)
             return True
         return False
     finally:
         conn.close()
 
 
-def listar_aceptaciones(evento_id: Optional[int] = None, query: Optional[str] = None) -> List[Dict[str, Any]]:
+# Columnas comunes del listado y del detalle de aceptaciones (texto fijo: la
+# sentencia preparada se reutiliza desde el cache de cada conexión)
+_COLUMNAS_ACEPTACION = """
+        a.id,
+        a.evento_id,
+        e.nombre AS evento_nombre,
+        e.fecha AS evento_fecha,
+        e.organizador AS evento_organizador,
+        a.nombre_participante,
+        a.documento,
+        a.fecha_hora,
+        a.ip,
+        a.user_agent,
+        a.deslinde_hash_sha256,
+        a.firma_path,
+        a.doc_frente_path,
+        a.doc_dorso_path,
+        a.audio_path,
+        a.salud_doc_path,
+        a.salud_doc_tipo,
+        a.audio_exento,
+        a.firma_asistida"""
+
+SQL_LISTADO_ACEPTACIONES = f"""
+    SELECT{_COLUMNAS_ACEPTACION}
+    FROM aceptaciones a
+    JOIN eventos e ON e.id = a.evento_id
+"""
+
+SQL_DETALLE_ACEPTACION = f"""
+    SELECT{_COLUMNAS_ACEPTACION},
+        a.pdf_token,
+        a.pdf_token_expires_at,
+        a.pdf_token_revoked,
+        a.pdf_last_access_at,
+        a.pdf_access_count,
+        a.email,
+        a.valido,
+        a.motivo_anulacion,
+        a.fecha_anulacion,
+        a.anulado_por,
+        a.estado_revision,
+        a.motivo_rechazo,
+        a.revisado_por,
+        a.fecha_revision
+    FROM aceptaciones a
+    JOIN eventos e ON e.id = a.evento_id
+    WHERE a.id = %s
+"""
+
+
+def listar_aceptaciones(
+    evento_id: Optional[int] = None,
+    query: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[Any]:
     """
     Lista aceptaciones con datos del evento (join simple).
     Filtra por evento si se especifica.
     Filtra por nombre o documento si query se especifica.
+    Pagina en SQL (LIMIT/OFFSET) si se especifica limit.
+    Devuelve las filas tal cual (sqlite3.Row o dict en PostgreSQL), sin
+    copiarlas a dicts: se accede por clave (a["col"]).
     """
     conn = _get_connection()
     try:
         cur = conn.cursor()
-        sql = """
-            SELECT
-                a.id,
-                a.evento_id,
-                e.nombre AS evento_nombre,
-                e.fecha AS evento_fecha,
-                e.organizador AS evento_organizador,
-                a.nombre_participante,
-                a.documento,
-                a.fecha_hora,
-                a.ip,
-                a.user_agent,
-                a.deslinde_hash_sha256,
-                a.firma_path,
-                a.doc_frente_path,
-                a.doc_dorso_path,
-                a.audio_path,
-                a.salud_doc_path,
-                a.salud_doc_tipo,
-                a.audio_exento,
-                a.firma_asistida
-            FROM aceptaciones a
-            JOIN eventos e ON e.id = a.evento_id
-        """
+        sql = SQL_LISTADO_ACEPTACIONES
         params = []
         conditions = []
 
@@ -254,31 +313,50 @@ def listar_aceptaciones(evento_id: Optional[int] = None, query: Optional[str] =
 
         sql += " ORDER BY a.id DESC"
 
+        if limit is not None:
+            sql += " LIMIT %s OFFSET %s"
+            params.extend([limit, offset])
+
         cur.execute(sql, tuple(params))
-        rows = cur.fetchall()
-        return [dict(r) for r in rows]
+        return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def contar_aceptaciones(evento_id: int) -> int:
+    """Cantidad de aceptaciones de un evento (sin traer las filas)."""
+    conn = _get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) AS c FROM aceptaciones WHERE evento_id = %s", (evento_id,))
+        row = cur.fetchone()
+        return row["c"] if row else 0
     finally:
         conn.close()
 
 
-def borrar_evidencias_fisicas(aceptaciones: List[Dict[str, Any]]):
+def borrar_evidencias_fisicas(aceptaciones: List[Any]):
     """Borra archivos físicos de una lista de aceptaciones."""
     count = 0
     for a in aceptaciones:
         paths = [
-            a.get('firma_path'),
-            a.get('doc_frente_path'),
-            a.get('doc_dorso_path'),
-            a.get('audio_path'),
-            a.get('salud_doc_path')
+            a['firma_path'],
+            a['doc_frente_path'],
+            a['doc_dorso_path'],
+            a['audio_path'],
+            a['salud_doc_path']
         ]
         for p in paths:
-            if p and os.path.exists(p):
-                try:
-                    os.remove(p)
-                    count += 1
-                except OSError as e:
-                    app_logger.error(f"Error borrando archivo {p}: {e}")
+            if not p:
+                continue
+            # os.remove directo (sin os.path.exists previo): un syscall por archivo
+            try:
+                os.remove(p)
+                count += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                app_logger.error("Error borrando archivo %s: %s", p, e)
     return count
 
 
@@ -288,11 +366,12 @@ def eliminar_aceptaciones_por_ids(ids: List[int]) -> int:
         return 0
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        placeholders = ','.join('?' * len(ids))
-        sql = f"DELETE FROM aceptaciones WHERE id IN ({placeholders})"
-        cur.execute(sql, ids)
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            placeholders = ','.join('?' * len(ids))
+            sql = f"DELETE FROM aceptaciones WHERE id IN ({placeholders})"
+            cur.execute(sql, ids)
+            conn.commit()
         return cur.rowcount
     finally:
         conn.close()
@@ -302,10 +381,12 @@ def eliminar_evento_completo(evento_id: int) -> bool:
     """Elimina un evento y todas sus referencias."""
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM aceptaciones WHERE evento_id = %s", (evento_id,))
-        cur.execute("DELETE FROM eventos WHERE id = %s", (evento_id,))
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            cur.execute("DELETE FROM aceptaciones WHERE evento_id = %s", (evento_id,))
+            cur.execute("DELETE FROM deslindes WHERE evento_id = %s", (evento_id,))
+            cur.execute("DELETE FROM eventos WHERE id = %s", (evento_id,))
+            conn.commit()
         return True
     finally:
         conn.close()
@@ -316,59 +397,14 @@ def get_aceptacion_detalle(aceptacion_id: int) -> Optional[Dict[str, Any]]:
     conn = _get_connection()
     try:
         cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT
-                a.id,
-                a.evento_id,
-                e.nombre AS evento_nombre,
-                e.fecha AS evento_fecha,
-                e.organizador AS evento_organizador,
-                a.nombre_participante,
-                a.documento,
-                a.fecha_hora,
-                a.ip,
-                a.user_agent,
-                a.deslinde_hash_sha256,
-                a.firma_path,
-                a.doc_frente_path,
-                a.doc_dorso_path,
-                a.audio_path,
-                a.salud_doc_path,
-                a.salud_doc_tipo,
-                a.audio_exento,
-                a.firma_asistida,
-                a.pdf_token,
-                a.pdf_token_expires_at,
-                a.pdf_token_revoked,
-                a.pdf_last_access_at,
-                a.pdf_access_count,
-                a.email,
-                a.valido,
-                a.motivo_anulacion,
-                a.fecha_anulacion,
-                a.anulado_por,
-                a.estado_revision,
-                a.motivo_rechazo,
-                a.revisado_por,
-                a.fecha_revision
-            FROM aceptaciones a
-            JOIN eventos e ON e.id = a.evento_id
-            WHERE a.id = %s
-            """,
-            (aceptacion_id,)
-        )
+        cur.execute(SQL_DETALLE_ACEPTACION, (aceptacion_id,))
         row = cur.fetchone()
         if not row:
             return None
 
         data = dict(row)
 
-        data['firma_exists'] = os.path.exists(data['firma_path']) if data['firma_path'] else False
-        data['doc_frente_exists'] = os.path.exists(data['doc_frente_path']) if data['doc_frente_path'] else False
-        data['doc_dorso_exists'] = os.path.exists(data['doc_dorso_path']) if data['doc_dorso_path'] else False
-        data['audio_exists'] = os.path.exists(data['audio_path']) if data['audio_path'] else False
-        data['salud_doc_exists'] = os.path.exists(data['salud_doc_path']) if data['salud_doc_path'] else False
+        marcar_evidencias_existentes(data)
 
         return data
     finally:
@@ -379,12 +415,13 @@ def revocar_pdf_token(aceptacion_id: int) -> bool:
     """Revoca el token PDF de una aceptación (soft revoke)."""
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        cur.execute(
-            "UPDATE aceptaciones SET pdf_token_revoked = 1 WHERE id = %s",
-            (aceptacion_id,)
-        )
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            cur.execute(
+                "UPDATE aceptaciones SET pdf_token_revoked = 1 WHERE id = %s",
+                (aceptacion_id,)
+            )
+            conn.commit()
         return cur.rowcount > 0
     finally:
         conn.close()
@@ -392,9 +429,12 @@ def revocar_pdf_token(aceptacion_id: int) -> bool:
 
 def calcular_hash_archivo(filepath: str) -> str:
     """Calcula SHA256 de un archivo en disco."""
-    sha256_hash = hashlib.sha256()
     with open(filepath, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
+        # Python 3.11+: el loop de lectura corre en C (sin overhead por bloque)
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        sha256_hash = hashlib.sha256()
+        for byte_block in iter(lambda: f.read(1024 * 1024), b""):
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
@@ -403,216 +443,222 @@ def calcular_hash_archivo(filepath: str) -> str:
 # Rutas admin
 # ------------------------------------------------------------------------------
 
-# ADMIN PATCH: fix admin home auth (moved security block up)
-# ADMIN PATCH: admin home v1
-@router.get("", response_class=HTMLResponse)
-@router.get("/home", response_class=HTMLResponse)
-def admin_home(username: str = Depends(get_current_username)) -> HTMLResponse:
-    """Dashboard principal de administración."""
-
-    html_content = """
-    <!doctype html>
-    <html lang="es">
-    <head>
-        <meta charset="utf-8" />
-        <meta name="viewport" content="width=device-width, initial-scale=1" />
-        <title>Admin Dashboard - EncarreraOK</title>
-        <style>
-            body {
-                font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif;
-                margin: 0;
-                background: #f4f6f9;
-                color: #333;
-            }
-            .header {
-                background: #fff;
-                padding: 1rem 1.5rem;
-                border-bottom: 1px solid #ddd;
-                display: flex;
-                align-items: center;
-                justify-content: space-between;
-                box-shadow: 0 1px 2px rgba(0,0,0,0.05);
-            }
-            .header h1 { margin: 0; font-size: 1.25rem; color: #1a1a1a; }
-            .user-info { font-size: 0.9rem; color: #666; }
-
-            .container {
-                max-width: 1000px;
-                margin: 2rem auto;
-                padding: 0 1.5rem;
-            }
-
-            .welcome-text {
-                margin-bottom: 2rem;
-                color: #555;
-            }
-
-            .grid {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-                gap: 1.5rem;
-            }
-
-            .card {
-                background: white;
-                border-radius: 8px;
-                padding: 1.5rem;
-                box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-                transition: transform 0.2s, box-shadow 0.2s;
-                text-decoration: none;
-                color: inherit;
-                border: 1px solid transparent;
-                display: flex;
-                flex-direction: column;
-                height: 100%;
-                box-sizing: border-box;
-            }
-
-            .card:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-                border-color: #b0c4de;
-            }
-
-            .card-icon {
-                font-size: 2rem;
-                margin-bottom: 1rem;
-            }
-
-            .card-title {
-                font-size: 1.1rem;
-                font-weight: 600;
-                margin-bottom: 0.5rem;
-                color: #0d6efd;
-            }
-
-            .card-desc {
-                font-size: 0.9rem;
-                color: #666;
-                line-height: 1.4;
-                flex-grow: 1;
-            }
-
-            .card-action {
-                margin-top: 1rem;
-                font-size: 0.9rem;
-                font-weight: 500;
-                color: #0d6efd;
-                display: flex;
-                align-items: center;
-            }
-            .card-action::after {
-                content: "\u2192";
-                margin-left: 5px;
-                transition: margin-left 0.2s;
-            }
-            .card:hover .card-action::after {
-                margin-left: 8px;
-            }
-
-            .card.disabled {
-                opacity: 0.6;
-                cursor: default;
-                background: #f8f9fa;
-            }
-            .card.disabled:hover {
-                transform: none;
-                box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-                border-color: transparent;
-            }
-            .card.disabled .card-title { color: #6c757d; }
-            .card.disabled .card-action { display: none; }
-
-            .badge {
-                display: inline-block;
-                padding: 2px 8px;
-                font-size: 0.75rem;
-                background: #e9ecef;
-                color: #495057;
-                border-radius: 10px;
-                margin-bottom: 0.5rem;
-            }
-
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <div>
-                <h1 style="margin:0; font-size: 1.5rem;">EncarreraOK <span style="font-weight:normal; font-size:1rem; color:#666;">Admin</span></h1>
-                <!-- BRAND PATCH: add logo -->
-                <img src="/assets/logo-encarreraok.png" alt="EncarreraOK" style="max-width:180px; width:100%; height:auto; margin-bottom:12px;">
-                <div style="font-size: 0.8rem; color: #666; text-transform: uppercase; letter-spacing: 1px;">Evidencia clara. Eventos seguros.</div>
-            </div>
-            <div class="user-info">Usuario: <strong>{{ username }}</strong></div>
+# Página estática del dashboard: se codifica a UTF-8 una sola vez al importar.
+# Por request solo se inserta el nombre de usuario entre ambas mitades.
+_ADMIN_HOME_HTML = """
+<!doctype html>
+<html lang="es">
+<head>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <title>Admin Dashboard - EncarreraOK</title>
+    <style>
+        body {
+            font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif;
+            margin: 0;
+            background: #f4f6f9;
+            color: #333;
+        }
+        .header {
+            background: #fff;
+            padding: 1rem 1.5rem;
+            border-bottom: 1px solid #ddd;
+            display: flex;
+            align-items: center;
+            justify-content: space-between;
+            box-shadow: 0 1px 2px rgba(0,0,0,0.05);
+        }
+        .header h1 { margin: 0; font-size: 1.25rem; color: #1a1a1a; }
+        .user-info { font-size: 0.9rem; color: #666; }
+
+        .container {
+            max-width: 1000px;
+            margin: 2rem auto;
+            padding: 0 1.5rem;
+        }
+
+        .welcome-text {
+            margin-bottom: 2rem;
+            color: #555;
+        }
+
+        .grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
+            gap: 1.5rem;
+        }
+
+        .card {
+            background: white;
+            border-radius: 8px;
+            padding: 1.5rem;
+            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+            transition: transform 0.2s, box-shadow 0.2s;
+            text-decoration: none;
+            color: inherit;
+            border: 1px solid transparent;
+            display: flex;
+            flex-direction: column;
+            height: 100%;
+            box-sizing: border-box;
+        }
+
+        .card:hover {
+            transform: translateY(-2px);
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+            border-color: #b0c4de;
+        }
+
+        .card-icon {
+            font-size: 2rem;
+            margin-bottom: 1rem;
+        }
+
+        .card-title {
+            font-size: 1.1rem;
+            font-weight: 600;
+            margin-bottom: 0.5rem;
+            color: #0d6efd;
+        }
+
+        .card-desc {
+            font-size: 0.9rem;
+            color: #666;
+            line-height: 1.4;
+            flex-grow: 1;
+        }
+
+        .card-action {
+            margin-top: 1rem;
+            font-size: 0.9rem;
+            font-weight: 500;
+            color: #0d6efd;
+            display: flex;
+            align-items: center;
+        }
+        .card-action::after {
+            content: "\u2192";
+            margin-left: 5px;
+            transition: margin-left 0.2s;
+        }
+        .card:hover .card-action::after {
+            margin-left: 8px;
+        }
+
+        .card.disabled {
+            opacity: 0.6;
+            cursor: default;
+            background: #f8f9fa;
+        }
+        .card.disabled:hover {
+            transform: none;
+            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+            border-color: transparent;
+        }
+        .card.disabled .card-title { color: #6c757d; }
+        .card.disabled .card-action { display: none; }
+
+        .badge {
+            display: inline-block;
+            padding: 2px 8px;
+            font-size: 0.75rem;
+            background: #e9ecef;
+            color: #495057;
+            border-radius: 10px;
+            margin-bottom: 0.5rem;
+        }
+
+    </style>
+</head>
+<body>
+    <div class="header">
+        <div>
+            <h1 style="margin:0; font-size: 1.5rem;">EncarreraOK <span style="font-weight:normal; font-size:1rem; color:#666;">Admin</span></h1>
+            <!-- BRAND PATCH: add logo -->
+            <img src="/assets/logo-encarreraok.png" alt="EncarreraOK" style="max-width:180px; width:100%; height:auto; margin-bottom:12px;">
+            <div style="font-size: 0.8rem; color: #666; text-transform: uppercase; letter-spacing: 1px;">Evidencia clara. Eventos seguros.</div>
         </div>
+        <div class="user-info">Usuario: <strong>{{ username }}</strong></div>
+    </div>
 
-        <div class="container">
-            <div class="welcome-text">
-                <p>Bienvenido al panel de control. Seleccione una opción para gestionar el sistema.</p>
-            </div>
+    <div class="container">
+        <div class="welcome-text">
+            <p>Bienvenido al panel de control. Seleccione una opción para gestionar el sistema.</p>
+        </div>
 
-            <div class="grid">
-                <!-- Gestión de Eventos -->
-                <a href="/admin/eventos" class="card">
-                    <div class="card-icon">&#128197;</div>
-                    <div class="card-title">Gestión de Eventos</div>
-                    <div class="card-desc">Crear, editar y configurar eventos activos. Obtener enlaces públicos.</div>
-                    <div class="card-action">Ir a Eventos</div>
-                </a>
-
-                <!-- Aceptaciones -->
-                <a href="/admin/aceptaciones" class="card">
-                    <div class="card-icon">&#128221;</div>
-                    <div class="card-title">Aceptaciones</div>
-                    <div class="card-desc">Listado completo de deslindes firmados. Filtrar, buscar y verificar evidencias.</div>
-                    <div class="card-action">Ver Registros</div>
-                </a>
-
-                <!-- Exportes -->
-                <a href="/admin/eventos" class="card">
-                    <div class="card-icon">&#128203;</div>
-                    <div class="card-title">Exportar CSV</div>
-                    <div class="card-desc">Descargar planilla CSV con el detalle de deslindes para cruzar con inscriptos.</div>
-                    <div class="card-action">Ir a Aceptaciones</div>
-                </a>
-
-                <!-- Monitor en Vivo -->
-                <a href="/admin/eventos" class="card">
-                    <div class="card-icon">&#128250;</div>
-                    <div class="card-title">Monitor de Entrada</div>
-                    <div class="card-desc">Pantalla de validación en tiempo real para operadores de acceso.</div>
-                    <div class="card-action">Seleccionar Evento</div>
-                </a>
-
-                <!-- Operadores -->
-                <a href="/admin/operadores" class="card">
-                    <div class="card-icon">&#128101;</div>
-                    <div class="card-title">Operadores</div>
-                    <div class="card-desc">Gestionar usuarios con acceso restringido al monitor y CSV por evento.</div>
-                    <div class="card-action">Gestionar</div>
-                </a>
-
-                <!-- Búsqueda Global -->
-                <a href="/admin/search" class="card">
-                    <div class="card-icon">&#128269;</div>
-                    <div class="card-title">Búsqueda Global</div>
-                    <div class="card-desc">Buscar deslindes por DNI o apellido en todos los eventos históricos.</div>
-                    <div class="card-action">Buscar ahora</div>
-                </a>
-
-                <div class="card disabled">
-                    <div class="card-icon">&#128202;</div>
-                    <span class="badge">Próximamente</span>
-                    <div class="card-title">Estado del Sistema</div>
-                    <div class="card-desc">Métricas de disco, uso de CPU y estado de servicios.</div>
-                </div>
+        <div class="grid">
+            <!-- Gestión de Eventos -->
+            <a href="/admin/eventos" class="card">
+                <div class="card-icon">&#128197;</div>
+                <div class="card-title">Gestión de Eventos</div>
+                <div class="card-desc">Crear, editar y configurar eventos activos. Obtener enlaces públicos.</div>
+                <div class="card-action">Ir a Eventos</div>
+            </a>
+
+            <!-- Aceptaciones -->
+            <a href="/admin/aceptaciones" class="card">
+                <div class="card-icon">&#128221;</div>
+                <div class="card-title">Aceptaciones</div>
+                <div class="card-desc">Listado completo de deslindes firmados. Filtrar, buscar y verificar evidencias.</div>
+                <div class="card-action">Ver Registros</div>
+            </a>
+
+            <!-- Exportes -->
+            <a href="/admin/eventos" class="card">
+                <div class="card-icon">&#128203;</div>
+                <div class="card-title">Exportar CSV</div>
+                <div class="card-desc">Descargar planilla CSV con el detalle de deslindes para cruzar con inscriptos.</div>
+                <div class="card-action">Ir a Aceptaciones</div>
+            </a>
+
+            <!-- Monitor en Vivo -->
+            <a href="/admin/eventos" class="card">
+                <div class="card-icon">&#128250;</div>
+                <div class="card-title">Monitor de Entrada</div>
+                <div class="card-desc">Pantalla de validación en tiempo real para operadores de acceso.</div>
+                <div class="card-action">Seleccionar Evento</div>
+            </a>
+
+            <!-- Operadores -->
+            <a href="/admin/operadores" class="card">
+                <div class="card-icon">&#128101;</div>
+                <div class="card-title">Operadores</div>
+                <div class="card-desc">Gestionar usuarios con acceso restringido al monitor y CSV por evento.</div>
+                <div class="card-action">Gestionar</div>
+            </a>
+
+            <!-- Búsqueda Global -->
+            <a href="/admin/search" class="card">
+                <div class="card-icon">&#128269;</div>
+                <div class="card-title">Búsqueda Global</div>
+                <div class="card-desc">Buscar deslindes por DNI o apellido en todos los eventos históricos.</div>
+                <div class="card-action">Buscar ahora</div>
+            </a>
+
+            <div class="card disabled">
+                <div class="card-icon">&#128202;</div>
+                <span class="badge">Próximamente</span>
+                <div class="card-title">Estado del Sistema</div>
+                <div class="card-desc">Métricas de disco, uso de CPU y estado de servicios.</div>
             </div>
         </div>
-    </body>
-    </html>
-    """
+    </div>
+</body>
+</html>
+"""
+_ADMIN_HOME_HTML_PRE, _ADMIN_HOME_HTML_POST = (
+    part.encode("utf-8") for part in _ADMIN_HOME_HTML.split("{{ username }}", 1)
+)
 
-    return HTMLResponse(content=html_content.replace("{{ username }}", username))
+
+# ADMIN PATCH: fix admin home auth (moved security block up)
+# ADMIN PATCH: admin home v1
+@router.get("", response_class=HTMLResponse)
+@router.get("/home", response_class=HTMLResponse)
+def admin_home(username: str = Depends(get_current_username)) -> Response:
+    """Dashboard principal de administración (bytes pre-codificados + usuario)."""
+    content = _ADMIN_HOME_HTML_PRE + escape(username).encode("utf-8") + _ADMIN_HOME_HTML_POST
+    return Response(content=content, media_type="text/html; charset=utf-8")
 # /ADMIN PATCH
 
 
@@ -622,9 +668,9 @@ def admin_search(q: Optional[str] = None, username: str = Depends(get_current_us
     """Búsqueda transversal de deslindes."""
     resultados = []
     if q:
-        resultados = listar_aceptaciones(query=q)[:50]
+        resultados = listar_aceptaciones(query=q, limit=50)
 
-    template = templates_env.get_template("admin_busqueda_deslindes.html")
+    template = _TPL_ADMIN_BUSQUEDA_DESLINDES
     html = template.render(query=q, resultados=resultados, username=username)
     return HTMLResponse(content=html)
 # /ADMIN PATCH
@@ -634,7 +680,7 @@ def admin_search(q: Optional[str] = None, username: str = Depends(get_current_us
 def admin_eventos(username: str = Depends(get_current_username)) -> HTMLResponse:
     """Listado de eventos para administración."""
     eventos = listar_eventos()
-    template = templates_env.get_template("admin_eventos_lista.html")
+    template = _TPL_ADMIN_EVENTOS_LISTA
     html = template.render(eventos=eventos, username=username)
     return HTMLResponse(content=html)
 
@@ -642,7 +688,7 @@ def admin_eventos(username: str = Depends(get_current_username)) -> HTMLResponse
 @router.get("/eventos/nuevo", response_class=HTMLResponse)
 def admin_evento_nuevo_form(username: str = Depends(get_current_username)) -> HTMLResponse:
     """Formulario para crear evento."""
-    template = templates_env.get_template("admin_eventos_form.html")
+    template = _TPL_ADMIN_EVENTOS_FORM
     html = template.render(evento=None, username=username)
     return HTMLResponse(content=html)
 
@@ -688,7 +734,7 @@ def admin_evento_nuevo_post(
         )
 
     except Exception as e:
-        app_logger.error(f"Error creando evento: {e}")
+        app_logger.error("Error creando evento: %s", e)
         raise HTTPException(status_code=500, detail=f"Error creando evento: {e}")
 
     # ADMIN PATCH: fix try except syntax
@@ -702,7 +748,7 @@ def admin_evento_editar_form(evento_id: int, username: str = Depends(get_current
     if not evento:
         raise HTTPException(status_code=404, detail="Evento no encontrado")
 
-    template = templates_env.get_template("admin_eventos_form.html")
+    template = _TPL_ADMIN_EVENTOS_FORM
     html = template.render(evento=evento, username=username)
     return HTMLResponse(content=html)
 
@@ -751,13 +797,14 @@ def admin_evento_editar_post(
 
         return RedirectResponse(url="/admin/eventos", status_code=303)
     except Exception as e:
-        app_logger.error(f"Error editando evento {evento_id}: {e}")
+        app_logger.error("Error editando evento %s: %s", evento_id, e)
         raise HTTPException(status_code=500, detail=f"Error editando evento: {e}")
 
 
 @router.get("/aceptaciones", response_class=HTMLResponse)
 def admin_aceptaciones(
     evento_id: Optional[int] = None,
+    page: int = 1,
     username: str = Depends(get_current_username)
 ) -> HTMLResponse:
     """
@@ -765,18 +812,33 @@ def admin_aceptaciones(
     - Requiere autenticación Basic Auth.
     - Ordenadas por ID descendente.
     - Soporta filtrado por evento_id.
+    - Paginada en SQL (ADMIN_ACEPTACIONES_PAGE_SIZE por página).
     """
-    datos = listar_aceptaciones(evento_id=evento_id)
+    page_size = ADMIN_ACEPTACIONES_PAGE_SIZE
+    if page is None or page < 1:
+        page = 1
+
+    # Se pide una fila extra solo para saber si hay página siguiente (sin COUNT)
+    datos = listar_aceptaciones(
+        evento_id=evento_id,
+        limit=page_size + 1,
+        offset=(page - 1) * page_size,
+    )
+    has_next = len(datos) > page_size
+    datos = datos[:page_size]
     eventos = listar_eventos()
 
     context = {
         "aceptaciones": datos,
         "eventos": eventos,
         "filtro_evento_id": evento_id,
-        "username": username
+        "username": username,
+        "page": page,
+        "has_prev": page > 1,
+        "has_next": has_next,
     }
 
-    template = templates_env.get_template("admin_aceptaciones.html")
+    template = _TPL_ADMIN_ACEPTACIONES
     html = template.render(**context)
     return HTMLResponse(content=html)
 
@@ -797,7 +859,7 @@ def admin_descargar_pdf_aceptacion(
 
     pdf_bytes = _generar_bytes_pdf(aceptacion, evento)
 
-    app_logger.info(f"PDF generado para aceptacion_id={aceptacion_id} evento_id={evento['id']}")
+    app_logger.info("PDF generado para aceptacion_id=%s evento_id=%s", aceptacion_id, evento['id'])
 
     filename = f"aceptacion_{aceptacion_id}.pdf"
     headers = {
@@ -928,7 +990,7 @@ def admin_exportar_csv(
     safe_name = "".join([c for c in evento["nombre"] if c.isalnum() or c in (' ', '_', '-')]).strip().replace(" ", "_")
     filename = f"deslindes_{safe_name}_{evento['fecha']}.csv"
 
-    app_logger.info(f"CSV exportado para evento {evento_id}: {len(rows)} registros.")
+    app_logger.info("CSV exportado para evento %s: %s registros.", evento_id, len(rows))
     return StreamingResponse(
         io.BytesIO(csv_bytes),
         media_type="text/csv; charset=utf-8",
@@ -946,12 +1008,10 @@ def admin_gestion_eliminacion(
     if not evento:
         raise HTTPException(status_code=404, detail="Evento no encontrado")
 
-    aceptaciones = listar_aceptaciones(evento_id=evento_id)
-
-    template = templates_env.get_template("admin_gestion_eliminacion.html")
+    template = _TPL_ADMIN_GESTION_ELIMINACION
     html = template.render(
         evento=evento,
-        total_aceptaciones=len(aceptaciones),
+        total_aceptaciones=contar_aceptaciones(evento_id),
         username=username
     )
     return HTMLResponse(content=html)
@@ -1043,7 +1103,7 @@ def admin_aceptacion_detalle(aceptacion_id: int, username: str = Depends(get_cur
     if not aceptacion:
         raise HTTPException(status_code=404, detail="Aceptación no encontrada")
 
-    template = templates_env.get_template("admin_aceptacion_detalle.html")
+    template = _TPL_ADMIN_ACEPTACION_DETALLE
     html = template.render(aceptacion=aceptacion, username=username)
     return HTMLResponse(content=html)
 
@@ -1062,10 +1122,10 @@ def admin_revocar_token(
 
     success = revocar_pdf_token(aceptacion_id)
     if success:
-        app_logger.info(f"Token PDF revocado manualmente por admin: id={aceptacion_id}, user={username}")
+        app_logger.info("Token PDF revocado manualmente por admin: id=%s, user=%s", aceptacion_id, username)
         msg = "Token revocado correctamente."
     else:
-        app_logger.warning(f"Fallo al revocar token PDF: id={aceptacion_id}")
+        app_logger.warning("Fallo al revocar token PDF: id=%s", aceptacion_id)
         msg = "No se pudo revocar el token o ya estaba revocado."
 
     return HTMLResponse(
@@ -1098,28 +1158,29 @@ def admin_anular_aceptacion(
 
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        fecha_anulacion = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-        cur.execute(
-            """
-            UPDATE aceptaciones
-            SET valido = 0,
-                motivo_anulacion = %s,
-                fecha_anulacion = %s,
-                anulado_por = %s
-            WHERE id = %s
-            """,
-            (motivo.strip(), fecha_anulacion, username, aceptacion_id),
-        )
-        _log_historial(conn, aceptacion_id, aceptacion["evento_id"], "ANULADO", username,
-                       json.dumps({"motivo": motivo.strip()}, ensure_ascii=False))
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            fecha_anulacion = ahora_utc_iso()
+            cur.execute(
+                """
+                UPDATE aceptaciones
+                SET valido = 0,
+                    motivo_anulacion = %s,
+                    fecha_anulacion = %s,
+                    anulado_por = %s
+                WHERE id = %s
+                """,
+                (motivo.strip(), fecha_anulacion, username, aceptacion_id),
+            )
+            _log_historial(conn, aceptacion_id, aceptacion["evento_id"], "ANULADO", username,
+                           json.dumps({"motivo": motivo.strip()}, ensure_ascii=False))
+            conn.commit()
         app_logger.info(
-            f"Aceptación anulada: id={aceptacion_id}, evento_id={aceptacion['evento_id']}, "
-            f"doc={aceptacion['documento']}, motivo='{motivo}', por={username}"
+            "Aceptación anulada: id=%s, evento_id=%s, doc=%s, motivo='%s', por=%s",
+            aceptacion_id, aceptacion['evento_id'], aceptacion['documento'], motivo, username,
         )
     except Exception as e:
-        app_logger.error(f"Error anulando aceptación {aceptacion_id}: {e}")
+        app_logger.error("Error anulando aceptación %s: %s", aceptacion_id, e)
         raise HTTPException(status_code=500, detail=f"Error al anular: {e}")
     finally:
         conn.close()
@@ -1162,32 +1223,33 @@ def admin_revisar_aceptacion(
         raise HTTPException(status_code=400, detail="No se puede revisar una aceptación anulada.")
 
     from app.db.database import sql_placeholders
-    fecha_revision = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    fecha_revision = ahora_utc_iso()
     motivo_rechazo = motivo.strip() if decision == "RECHAZADO" else None
 
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        cur.execute(
-            f"UPDATE aceptaciones SET estado_revision = {sql_placeholders(1, conn)}, "
-            f"revisado_por = {sql_placeholders(1, conn)}, "
-            f"fecha_revision = {sql_placeholders(1, conn)}, "
-            f"motivo_rechazo = {sql_placeholders(1, conn)} "
-            f"WHERE id = {sql_placeholders(1, conn)}",
-            (decision, username, fecha_revision, motivo_rechazo, aceptacion_id),
-        )
-        recarga_token = None
-        if decision == "RECHAZADO" and aceptacion.get("email"):
-            recarga_token = _generar_recarga_token(conn, aceptacion_id)
-        detalle = json.dumps({"decision": decision, "motivo": motivo_rechazo}, ensure_ascii=False)
-        _log_historial(conn, aceptacion_id, aceptacion["evento_id"], f"REVISION_{decision}", username, detalle)
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            cur.execute(
+                f"UPDATE aceptaciones SET estado_revision = {sql_placeholders(1, conn)}, "
+                f"revisado_por = {sql_placeholders(1, conn)}, "
+                f"fecha_revision = {sql_placeholders(1, conn)}, "
+                f"motivo_rechazo = {sql_placeholders(1, conn)} "
+                f"WHERE id = {sql_placeholders(1, conn)}",
+                (decision, username, fecha_revision, motivo_rechazo, aceptacion_id),
+            )
+            recarga_token = None
+            if decision == "RECHAZADO" and aceptacion.get("email"):
+                recarga_token = _generar_recarga_token(conn, aceptacion_id)
+            detalle = json.dumps({"decision": decision, "motivo": motivo_rechazo}, ensure_ascii=False)
+            _log_historial(conn, aceptacion_id, aceptacion["evento_id"], f"REVISION_{decision}", username, detalle)
+            conn.commit()
         app_logger.info(
-            f"Revisión registrada: id={aceptacion_id}, decision={decision}, "
-            f"doc={aceptacion['documento']}, por={username}"
+            "Revisión registrada: id=%s, decision=%s, doc=%s, por=%s",
+            aceptacion_id, decision, aceptacion['documento'], username,
         )
     except Exception as e:
-        app_logger.error(f"Error revisando aceptación {aceptacion_id}: {e}")
+        app_logger.error("Error revisando aceptación %s: %s", aceptacion_id, e)
         raise HTTPException(status_code=500, detail=f"Error al revisar: {e}")
     finally:
         conn.close()
@@ -1269,37 +1331,32 @@ def admin_monitor_evento(
 
         where_sql = " AND ".join(where_clauses)
 
+        # Sin JOIN a eventos: el evento ya se obtuvo arriba y el filtro es
+        # solo sobre aceptaciones (idx_aceptaciones_evento_fecha).
         sql_count = f"""
             SELECT COUNT(*) AS c
             FROM aceptaciones a
-            JOIN eventos e ON e.id = a.evento_id
             WHERE {where_sql}
         """
         cur.execute(sql_count, tuple(params_base))
         row = cur.fetchone()
         total_filtrado = row["c"] if row else 0
 
+        # Solo las columnas que muestra el monitor
         sql_list = f"""
             SELECT
                 a.id,
                 a.evento_id,
-                e.nombre AS evento_nombre,
-                e.fecha AS evento_fecha,
-                e.organizador AS evento_organizador,
                 a.nombre_participante,
                 a.documento,
                 a.fecha_hora,
                 a.ip,
-                a.user_agent,
-                a.deslinde_hash_sha256,
                 a.firma_path,
                 a.doc_frente_path,
                 a.doc_dorso_path,
                 a.audio_path,
                 a.salud_doc_path,
-                a.salud_doc_tipo,
                 a.audio_exento,
-                a.firma_asistida,
                 a.valido,
                 a.motivo_anulacion,
                 a.fecha_anulacion,
@@ -1309,7 +1366,6 @@ def admin_monitor_evento(
                 a.fecha_revision,
                 a.motivo_rechazo
             FROM aceptaciones a
-            JOIN eventos e ON e.id = a.evento_id
             WHERE {where_sql}
             ORDER BY a.fecha_hora DESC
             LIMIT %s OFFSET %s
@@ -1326,7 +1382,7 @@ def admin_monitor_evento(
     has_next = page * page_size < total_filtrado
     # /ADMIN PATCH
 
-    template = templates_env.get_template("admin_monitor_evento.html")
+    template = _TPL_ADMIN_MONITOR_EVENTO
     html = template.render(
         evento=evento,
         aceptaciones=aceptaciones,
@@ -1361,7 +1417,7 @@ def admin_preview_evento(
     if str(aceptacion["evento_id"]) != str(evento_id):
         raise HTTPException(status_code=400, detail="Aceptación no pertenece al evento")
 
-    template = templates_env.get_template("admin_preview.html")
+    template = _TPL_ADMIN_PREVIEW
     html = template.render(
         evento=evento,
         aceptacion=aceptacion,
@@ -1416,6 +1472,10 @@ def admin_servir_evidencia(
         media_type = "image/png"
     elif ext.lower() == '.webm':
         media_type = "audio/webm"
+    elif ext.lower() == '.ogg':
+        media_type = "audio/ogg"
+    elif ext.lower() == '.mp4':
+        media_type = "audio/mp4"
     elif ext.lower() == '.pdf':
         media_type = "application/pdf"
 
@@ -1437,13 +1497,10 @@ def admin_servir_evidencia(
                 buf.seek(0)
                 return StreamingResponse(buf, media_type=media_type)
         except Exception as e:
-            app_logger.error(f"Error generando thumbnail para {file_path}: {e}")
-
-    def iterfile():
-        with open(file_path, mode="rb") as file_like:
-            yield from file_like
+            app_logger.error("Error generando thumbnail para %s: %s", file_path, e)
 
-    return StreamingResponse(iterfile(), media_type=media_type)
+    # X-Accel-Redirect o FileResponse: sin iterar el archivo en Python
+    return respuesta_evidencia(file_path, media_type)
 
 
 # ADMIN PATCH: serve local evidences
@@ -1482,7 +1539,7 @@ def admin_ver_evidencia_full(
     if not os.path.isfile(file_path):
         raise HTTPException(status_code=400, detail="El path no es un archivo válido")
 
-    return FileResponse(file_path)
+    return respuesta_evidencia(file_path)
 
 
 # ===========================================================================
@@ -1516,7 +1573,7 @@ def admin_operadores(
     username: str = Depends(get_current_username),
 ) -> HTMLResponse:
     """Listado y gestión de operadores."""
-    template = templates_env.get_template("admin_operadores.html")
+    template = _TPL_ADMIN_OPERADORES
     html = template.render(
         username=username,
         operadores=_listar_operadores(),
@@ -1546,19 +1603,20 @@ def admin_operadores_nuevo(
 
     ids_str = ",".join(str(i) for i in evento_ids)
     pwd_hash = hash_password(password)
-    created_at = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    created_at = ahora_utc_iso()
 
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO operadores (username, password_hash, evento_ids, activo, created_at) VALUES (%s, %s, %s, 1, %s)",
-            (username_op, pwd_hash, ids_str, created_at)
-        )
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            cur.execute(
+                "INSERT INTO operadores (username, password_hash, evento_ids, activo, created_at) VALUES (%s, %s, %s, 1, %s)",
+                (username_op, pwd_hash, ids_str, created_at)
+            )
+            conn.commit()
     except Exception as e:
         conn.rollback()
-        app_logger.error(f"Error creando operador '{username_op}': {e}")
+        app_logger.error("Error creando operador '%s': %s", username_op, e)
         return RedirectResponse(
             url=f"/admin/operadores?error=El+usuario+ya+existe+o+hubo+un+error",
             status_code=303
@@ -1566,7 +1624,7 @@ def admin_operadores_nuevo(
     finally:
         conn.close()
 
-    app_logger.info(f"Operador creado: {username_op} por admin {username}")
+    app_logger.info("Operador creado: %s por admin %s", username_op, username)
     return RedirectResponse(url=f"/admin/operadores?msg=Operador+{username_op}+creado+correctamente", status_code=303)
 
 
@@ -1578,19 +1636,20 @@ def admin_operadores_toggle(
     """Activa o desactiva un operador."""
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        cur.execute("SELECT activo, username FROM operadores WHERE id = %s", (op_id,))
-        row = cur.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Operador no encontrado")
-        nuevo_estado = 0 if row["activo"] else 1
-        cur.execute("UPDATE operadores SET activo = %s WHERE id = %s", (nuevo_estado, op_id))
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            cur.execute("SELECT activo, username FROM operadores WHERE id = %s", (op_id,))
+            row = cur.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Operador no encontrado")
+            nuevo_estado = 0 if row["activo"] else 1
+            cur.execute("UPDATE operadores SET activo = %s WHERE id = %s", (nuevo_estado, op_id))
+            conn.commit()
         op_username = row["username"]
     finally:
         conn.close()
 
-    app_logger.info(f"Operador {op_username} {'activado' if nuevo_estado else 'desactivado'} por {username}")
+    app_logger.info("Operador %s %s por %s", op_username, 'activado' if nuevo_estado else 'desactivado', username)
     return RedirectResponse(url="/admin/operadores?msg=Estado+actualizado", status_code=303)
 
 
@@ -1604,13 +1663,14 @@ def admin_operadores_eventos(
     ids_str = ",".join(str(i) for i in evento_ids)
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        cur.execute("UPDATE operadores SET evento_ids = %s WHERE id = %s", (ids_str, op_id))
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            cur.execute("UPDATE operadores SET evento_ids = %s WHERE id = %s", (ids_str, op_id))
+            conn.commit()
     finally:
         conn.close()
 
-    app_logger.info(f"Eventos de operador {op_id} actualizados a [{ids_str}] por {username}")
+    app_logger.info("Eventos de operador %s actualizados a [%s] por %s", op_id, ids_str, username)
     return RedirectResponse(url="/admin/operadores?msg=Eventos+actualizados", status_code=303)
 
 
@@ -1629,11 +1689,12 @@ def admin_operadores_password(
     pwd_hash = hash_password(password)
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        cur.execute("UPDATE operadores SET password_hash = %s WHERE id = %s", (pwd_hash, op_id))
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            cur.execute("UPDATE operadores SET password_hash = %s WHERE id = %s", (pwd_hash, op_id))
+            conn.commit()
     finally:
         conn.close()
 
-    app_logger.info(f"Contraseña de operador {op_id} actualizada por {username}")
+    app_logger.info("Contraseña de operador %s actualizada por %s", op_id, username)
     return RedirectResponse(url="/admin/operadores?msg=Contrase%C3%B1a+actualizada", status_code=303)
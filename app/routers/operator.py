@@ -18,32 +18,40 @@ import io
 import json
 import logging
 import os
-from datetime import datetime
 from typing import Any, List, Optional
 
 from fastapi import APIRouter, Depends, Form, HTTPException
 from fastapi.responses import HTMLResponse, StreamingResponse
 
 from app.middleware.auth_operator import get_current_operator, check_evento_access
-from app.templates_config import templates_env
+from app.templates_config import TEMPLATES
+from app.utils import ahora_utc_iso, marcar_evidencias_existentes, respuesta_evidencia
 
 app_logger = logging.getLogger("encarreraok")
 
 router = APIRouter(prefix="/op")
 
+# Templates usados por este router, resueltos una vez al importar
+_TPL_OP_MONITOR_EVENTO = TEMPLATES["op_monitor_evento.html"]
+_TPL_OP_PREVIEW = TEMPLATES["op_preview.html"]
+
 
 def _get_connection():
     from app.db.database import get_connection
     return get_connection()
 
 
+def _escritura_sqlite(conn):
+    from app.db.database import escritura_sqlite
+    return escritura_sqlite(conn)
+
+
 def _generar_recarga_token(conn, aceptacion_id: int, horas: int = 72) -> str:
     """Genera y guarda un token de re-carga válido por `horas` horas."""
     import secrets
-    from datetime import timedelta
     from app.db.database import sql_placeholders
     token = secrets.token_urlsafe(32)
-    expires_at = (datetime.utcnow() + timedelta(hours=horas)).replace(microsecond=0).isoformat() + "Z"
+    expires_at = ahora_utc_iso(horas * 3600)
     cur = conn.cursor()
     cur.execute(
         f"UPDATE aceptaciones SET recarga_token = {sql_placeholders(1, conn)}, "
@@ -57,7 +65,7 @@ def _generar_recarga_token(conn, aceptacion_id: int, horas: int = 72) -> str:
 def _log_historial(conn, aceptacion_id: int, evento_id: int, accion: str, realizado_por: str, detalle: str = None):
     """Inserta una entrada en aceptaciones_historial."""
     from app.db.database import sql_placeholders
-    fecha = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    fecha = ahora_utc_iso()
     try:
         cur = conn.cursor()
         cur.execute(
@@ -66,7 +74,7 @@ def _log_historial(conn, aceptacion_id: int, evento_id: int, accion: str, realiz
             (aceptacion_id, evento_id, accion, realizado_por, fecha, detalle),
         )
     except Exception as e:
-        app_logger.warning(f"No se pudo registrar historial: {e}")
+        app_logger.warning("No se pudo registrar historial: %s", e)
 
 
 def _get_evento(evento_id: int) -> Optional[dict]:
@@ -163,7 +171,7 @@ def op_monitor(
     has_prev = page > 1
     has_next = page * page_size < total_filtrado
 
-    template = templates_env.get_template("op_monitor_evento.html")
+    template = _TPL_OP_MONITOR_EVENTO
     html = template.render(
         evento=evento,
         aceptaciones=aceptaciones,
@@ -209,11 +217,7 @@ def _get_aceptacion_detalle(aceptacion_id: int) -> Optional[dict]:
         if not row:
             return None
         data = dict(row)
-        data["firma_exists"]     = os.path.exists(data["firma_path"])     if data.get("firma_path")     else False
-        data["doc_frente_exists"]= os.path.exists(data["doc_frente_path"])if data.get("doc_frente_path")else False
-        data["doc_dorso_exists"] = os.path.exists(data["doc_dorso_path"]) if data.get("doc_dorso_path") else False
-        data["audio_exists"]     = os.path.exists(data["audio_path"])     if data.get("audio_path")     else False
-        data["salud_doc_exists"] = os.path.exists(data["salud_doc_path"]) if data.get("salud_doc_path") else False
+        marcar_evidencias_existentes(data)
         return data
     finally:
         conn.close()
@@ -235,7 +239,7 @@ def op_preview(
         raise HTTPException(status_code=403, detail="La aceptación no pertenece a este evento")
 
     evento = _get_evento(evento_id)
-    template = templates_env.get_template("op_preview.html")
+    template = _TPL_OP_PREVIEW
     html = template.render(
         evento=evento,
         aceptacion=aceptacion,
@@ -290,6 +294,10 @@ def op_servir_evidencia(
         media_type = "image/png"
     elif ext == ".webm":
         media_type = "audio/webm"
+    elif ext == ".ogg":
+        media_type = "audio/ogg"
+    elif ext == ".mp4":
+        media_type = "audio/mp4"
     elif ext == ".pdf":
         media_type = "application/pdf"
 
@@ -307,13 +315,10 @@ def op_servir_evidencia(
                 buf.seek(0)
                 return StreamingResponse(buf, media_type=media_type)
         except Exception as e:
-            app_logger.warning(f"[op:{operador['username']}] Thumbnail falló para {file_path}: {e}")
+            app_logger.warning("[op:%s] Thumbnail falló para %s: %s", operador['username'], file_path, e)
 
-    def iterfile():
-        with open(file_path, "rb") as f:
-            yield from f
-
-    return StreamingResponse(iterfile(), media_type=media_type)
+    # X-Accel-Redirect o FileResponse: sin iterar el archivo en Python
+    return respuesta_evidencia(file_path, media_type)
 
 
 # ---------------------------------------------------------------------------
@@ -361,33 +366,34 @@ def op_anular_aceptacion(
         raise HTTPException(status_code=400, detail="La aceptación ya está anulada")
 
     op_username = operador["username"]
-    fecha_anulacion = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    fecha_anulacion = ahora_utc_iso()
 
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            UPDATE aceptaciones
-            SET valido = 0,
-                motivo_anulacion = %s,
-                fecha_anulacion = %s,
-                anulado_por = %s
-            WHERE id = %s
-            """,
-            (motivo.strip(), fecha_anulacion, op_username, aceptacion_id),
-        )
-        _log_historial(conn, aceptacion_id, evento_id, "ANULADO", op_username,
-                       json.dumps({"motivo": motivo.strip()}, ensure_ascii=False))
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            cur.execute(
+                """
+                UPDATE aceptaciones
+                SET valido = 0,
+                    motivo_anulacion = %s,
+                    fecha_anulacion = %s,
+                    anulado_por = %s
+                WHERE id = %s
+                """,
+                (motivo.strip(), fecha_anulacion, op_username, aceptacion_id),
+            )
+            _log_historial(conn, aceptacion_id, evento_id, "ANULADO", op_username,
+                           json.dumps({"motivo": motivo.strip()}, ensure_ascii=False))
+            conn.commit()
         app_logger.info(
-            f"[op:{op_username}] Aceptación anulada: id={aceptacion_id}, "
-            f"evento_id={evento_id}, doc={aceptacion['documento']}, "
-            f"nombre='{aceptacion['nombre_participante']}', motivo='{motivo.strip()}'"
+            "[op:%s] Aceptación anulada: id=%s, evento_id=%s, doc=%s, nombre='%s', motivo='%s'",
+            op_username, aceptacion_id, evento_id, aceptacion['documento'],
+            aceptacion['nombre_participante'], motivo.strip(),
         )
     except Exception as e:
         conn.rollback()
-        app_logger.error(f"[op:{op_username}] Error anulando aceptación {aceptacion_id}: {e}")
+        app_logger.error("[op:%s] Error anulando aceptación %s: %s", op_username, aceptacion_id, e)
         raise HTTPException(status_code=500, detail=f"Error al anular: {e}")
     finally:
         conn.close()
@@ -427,29 +433,30 @@ def op_revisar_aceptacion(
 
     from app.db.database import sql_placeholders
     op_username = operador["username"]
-    fecha_revision = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    fecha_revision = ahora_utc_iso()
     motivo_rechazo = motivo.strip() if decision == "RECHAZADO" else None
 
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        cur.execute(
-            f"UPDATE aceptaciones SET estado_revision = {sql_placeholders(1, conn)}, "
-            f"revisado_por = {sql_placeholders(1, conn)}, "
-            f"fecha_revision = {sql_placeholders(1, conn)}, "
-            f"motivo_rechazo = {sql_placeholders(1, conn)} "
-            f"WHERE id = {sql_placeholders(1, conn)}",
-            (decision, op_username, fecha_revision, motivo_rechazo, aceptacion_id),
-        )
-        recarga_token = None
-        if decision == "RECHAZADO" and aceptacion.get("email"):
-            recarga_token = _generar_recarga_token(conn, aceptacion_id)
-        _log_historial(conn, aceptacion_id, evento_id, f"REVISION_{decision}", op_username,
-                       json.dumps({"decision": decision, "motivo": motivo_rechazo}, ensure_ascii=False))
-        conn.commit()
-        app_logger.info(f"[op:{op_username}] Revisión id={aceptacion_id}, decision={decision}")
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            cur.execute(
+                f"UPDATE aceptaciones SET estado_revision = {sql_placeholders(1, conn)}, "
+                f"revisado_por = {sql_placeholders(1, conn)}, "
+                f"fecha_revision = {sql_placeholders(1, conn)}, "
+                f"motivo_rechazo = {sql_placeholders(1, conn)} "
+                f"WHERE id = {sql_placeholders(1, conn)}",
+                (decision, op_username, fecha_revision, motivo_rechazo, aceptacion_id),
+            )
+            recarga_token = None
+            if decision == "RECHAZADO" and aceptacion.get("email"):
+                recarga_token = _generar_recarga_token(conn, aceptacion_id)
+            _log_historial(conn, aceptacion_id, evento_id, f"REVISION_{decision}", op_username,
+                           json.dumps({"decision": decision, "motivo": motivo_rechazo}, ensure_ascii=False))
+            conn.commit()
+        app_logger.info("[op:%s] Revisión id=%s, decision=%s", op_username, aceptacion_id, decision)
     except Exception as e:
-        app_logger.error(f"[op:{op_username}] Error revisando aceptación {aceptacion_id}: {e}")
+        app_logger.error("[op:%s] Error revisando aceptación %s: %s", op_username, aceptacion_id, e)
         raise HTTPException(status_code=500, detail=f"Error al revisar: {e}")
     finally:
         conn.close()
@@ -563,7 +570,7 @@ def op_exportar_csv(
     safe_name = "".join([c for c in evento["nombre"] if c.isalnum() or c in (' ', '_', '-')]).strip().replace(" ", "_")
     filename = f"deslindes_{safe_name}_{evento['fecha']}.csv"
 
-    app_logger.info(f"[op:{operador['username']}] CSV exportado para evento {evento_id}: {len(rows)} registros.")
+    app_logger.info("[op:%s] CSV exportado para evento %s: %s registros.", operador['username'], evento_id, len(rows))
     return StreamingResponse(
         io.BytesIO(csv_bytes),
         media_type="text/csv; charset=utf-8",
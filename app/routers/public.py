@@ -12,20 +12,24 @@ Endpoints:
 import io
 import os
 import re
-import base64
+import hashlib
 import uuid
 import secrets
 import shutil
+import tempfile
 import logging
-import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
+from markupsafe import Markup, escape
+
 from fastapi import APIRouter, Request, Form, HTTPException, UploadFile, File
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, StreamingResponse, Response
 
-from app.config import settings
-from app.templates_config import templates_env
+from app.templates_config import TEMPLATES
+from app.utils import EVIDENCIAS_DIR, ahora_utc_iso
 from app.pdf_generator import (
     _generar_bytes_pdf,
     cargar_deslinde,
@@ -37,6 +41,11 @@ app_logger = logging.getLogger('encarreraok')
 
 router = APIRouter()
 
+# Templates usados por este router, resueltos una vez al importar
+_TPL_CONFIRMACION = TEMPLATES["confirmacion.html"]
+_TPL_EVENTO_FORM = TEMPLATES["evento_form.html"]
+_TPL_RECARGA_FORM = TEMPLATES["recarga_form.html"]
+
 # ------------------------------------------------------------------------------
 # Constantes de límites de tamaño (compartidas con admin router)
 # ------------------------------------------------------------------------------
@@ -45,64 +54,289 @@ MAX_FIRMA_MB = 1
 MAX_AUDIO_MB = 5
 MAX_IMAGE_COMPRESS_THRESHOLD_MB = 2
 MAX_IMAGE_COMPRESS_TARGET_MB = 1.5
+# Tope del body completo de un POST: 3 imágenes + audio y firma en base64 (+33%)
+# más margen para campos de texto. Se valida por Content-Length (middleware).
+MAX_REQUEST_BODY_MB = 3 * MAX_IMAGE_DOC_MB + (MAX_AUDIO_MB + MAX_FIRMA_MB) * 4 / 3 + 1
+# Dimensión máxima (px) de las fotos de documentos al re-comprimir
+MAX_IMAGE_DIM = 2048
+# Pool para guardar y comprimir fotos de documentos en paralelo (frente y dorso
+# de un mismo envío). Pillow libera el GIL al decodificar, redimensionar y
+# codificar, así que alcanza con threads: sin procesos hijos ni serializar las
+# imágenes.
+POOL_COMPRESION = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix="comprimir")
+# Tamaño de bloque para copiar uploads a disco
+UPLOAD_CHUNK_BYTES = 1024 * 1024
 
 # Intentar importar PIL para compresión de imágenes (opcional)
 try:
-    from PIL import Image
+    from PIL import Image, ImageOps
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
 
-# Directorios de almacenamiento de evidencias
-# Intenta usar el directorio junto a DB_PATH; si no es escribible, usa el
-# directorio del proyecto (worktree) como fallback para desarrollo local.
-DB_PATH = settings.db_path
-_evidencias_candidate = os.path.join(os.path.dirname(DB_PATH), "evidencias")
-_project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-_evidencias_fallback = os.path.join(_project_root, "evidencias")
-
-def _resolve_evidencias_dir() -> str:
-    """Devuelve el primer directorio de evidencias que se puede crear/escribir."""
-    for candidate in [_evidencias_candidate, _evidencias_fallback]:
-        try:
-            os.makedirs(candidate, exist_ok=True)
-            test = os.path.join(candidate, ".write_test")
-            with open(test, "w") as f:
-                f.write("ok")
-            os.remove(test)
-            return candidate
-        except Exception:
-            continue
-    # Último recurso: directorio temporal del sistema
-    import tempfile
-    td = os.path.join(tempfile.gettempdir(), "encarreraok_evidencias")
-    os.makedirs(td, exist_ok=True)
-    return td
-
-EVIDENCIAS_DIR  = _resolve_evidencias_dir()
+# pybase64 (codificador/decodificador SIMD) es opcional; misma API que base64 de la stdlib
+try:
+    from pybase64 import b64decode, b64encode
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    from base64 import b64decode, b64encode
+    PYBASE64_AVAILABLE = False
+
+# Subdirectorios de evidencias (el directorio base se resuelve en app.utils)
 FIRMAS_DIR      = os.path.join(EVIDENCIAS_DIR, "firmas")
 DOCUMENTOS_DIR  = os.path.join(EVIDENCIAS_DIR, "documentos")
 AUDIOS_DIR      = os.path.join(EVIDENCIAS_DIR, "audios")
 SALUD_DIR       = os.path.join(EVIDENCIAS_DIR, "salud")
+# Evidencias de una aceptación en curso; se mueven a su directorio definitivo
+# con os.replace (mismo filesystem) recién cuando el INSERT fue exitoso.
+STAGING_DIR     = os.path.join(EVIDENCIAS_DIR, ".staging")
 
 # Crear subdirectorios
-for _d in [FIRMAS_DIR, DOCUMENTOS_DIR, AUDIOS_DIR, SALUD_DIR]:
+for _d in [FIRMAS_DIR, DOCUMENTOS_DIR, AUDIOS_DIR, SALUD_DIR, STAGING_DIR]:
     os.makedirs(_d, exist_ok=True)
 
-app_logger.info(f"Evidencias dir: {EVIDENCIAS_DIR}")
+# Las wheels de Pillow traen libjpeg-turbo (DCT y conversión de color con SIMD);
+# un Pillow compilado contra libjpeg clásico comprime las fotos varias veces más lento
+if PIL_AVAILABLE:
+    from PIL import features as _pil_features
+    if not _pil_features.check_feature("libjpeg_turbo"):
+        app_logger.warning("Pillow sin libjpeg-turbo: la compresión de fotos de documentos será más lenta")
+
+
+class BitacoraRequest:
+    """
+    Junta los eventos INFO de un request y los emite como un único registro al
+    final (un LogRecord y una línea en app.log por envío, en vez de uno por
+    evidencia guardada). WARNING y ERROR se siguen logueando en el momento.
+    """
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.eventos: list = []
+        self.emitida = False
+
+    def info(self, msg: str, *args) -> None:
+        self.eventos.append(msg % args if args else msg)
+
+    def emitir(self, resumen: str, *args) -> None:
+        """Emite el resumen con los eventos acumulados; solo la primera vez."""
+        if self.emitida:
+            return
+        self.emitida = True
+        app_logger.info(
+            "[%s] " + resumen + " | %s", self.request_id, *args, " | ".join(self.eventos)
+        )
+
+
+# Separadores que se eliminan al normalizar un documento: punto, guión y los
+# mismos espacios que \s (str.isspace), como tabla de str.translate
+_SEPARADORES_DOC = str.maketrans("", "", ".-" + "".join(
+    ch for ch in map(chr, (*range(0x09, 0x0E), *range(0x1C, 0x21), 0x85, 0xA0, 0x1680,
+                           *range(0x2000, 0x200B), 0x2028, 0x2029, 0x202F, 0x205F, 0x3000))
+))
 
 
 def normalizar_documento_helper(doc: str) -> str:
     """Normaliza documento: quita puntos, guiones, espacios y pasa a mayúsculas."""
     if not doc:
         return ""
-    return re.sub(r"[.\-\s]", "", doc).upper()
+    return doc.translate(_SEPARADORES_DOC).upper()
+
+
+def _tamano_upload(upload: UploadFile) -> int:
+    """
+    Tamaño del archivo subido. Starlette lo registra (UploadFile.size) mientras
+    parsea el multipart; seek/tell solo si no viene.
+    """
+    if upload.size is not None:
+        return upload.size
+    upload.file.seek(0, os.SEEK_END)
+    size = upload.file.tell()
+    upload.file.seek(0)
+    return size
+
+
+def _guardar_upload(upload: UploadFile, filepath: str, max_bytes: Optional[int] = None) -> tuple:
+    """
+    Copia un UploadFile a disco en bloques de UPLOAD_CHUNK_BYTES, calculando
+    el SHA-256 en la misma pasada. Retorna (bytes_escritos, sha256_hex).
+    Si se supera max_bytes, borra el archivo parcial y lanza HTTPException 413.
+    """
+    hasher = hashlib.sha256()
+    total = 0
+    src = upload.file
+    src.seek(0)
+    with open(filepath, "wb") as dst:
+        while True:
+            chunk = src.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            total += len(chunk)
+            if max_bytes is not None and total > max_bytes:
+                break
+            hasher.update(chunk)
+            dst.write(chunk)
+    if max_bytes is not None and total > max_bytes:
+        os.remove(filepath)
+        raise HTTPException(
+            status_code=413,
+            detail=f"El archivo supera el máximo permitido de {max_bytes // (1024 * 1024)} MB."
+        )
+    return total, hasher.hexdigest()
+
+
+def _escribir_archivo(filepath: str, data: bytes) -> None:
+    """
+    Escribe una evidencia que ya está en memoria con os.open/os.write: sin
+    objeto de archivo ni buffer de Python en el medio, una syscall por
+    escritura (el loop solo repite si el kernel acepta una escritura parcial).
+    """
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0), 0o666)
+    try:
+        vista = memoryview(data)
+        while vista:
+            vista = vista[os.write(fd, vista):]
+    finally:
+        os.close(fd)
 
 
-def comprimir_imagen(file_path: str, max_size_mb: float = MAX_IMAGE_COMPRESS_TARGET_MB) -> Optional[str]:
+def _guardar_imagen(upload: UploadFile, filepath: str, size: int) -> tuple:
+    """
+    Guarda una foto subida en filepath. Si supera el umbral de compresión se
+    lee a memoria (ya acotada por MAX_IMAGE_DOC_MB), se comprime desde esos
+    bytes y se escribe una sola vez; si no, se copia en bloques.
+    Retorna (size_final, sha256_original); size_final es None si la imagen
+    necesitaba compresión y no se pudo comprimir (no se escribe nada).
+    """
+    if size <= MAX_IMAGE_COMPRESS_THRESHOLD_MB * 1024 * 1024:
+        return _guardar_upload(upload, filepath)
+
+    upload.file.seek(0)
+    data = upload.file.read()
+    sha = hashlib.sha256(data).hexdigest()
+    data = comprimir_imagen(data, MAX_IMAGE_COMPRESS_TARGET_MB)
+    if data is None:
+        return None, sha
+    _escribir_archivo(filepath, data)
+    return len(data), sha
+
+
+# Extensión de archivo por MIME de audio grabado (el resto va como .webm)
+_EXTENSIONES_AUDIO = {
+    "audio/mp3": ".mp3",
+    "audio/mpeg": ".mp3",
+    "audio/wav": ".wav",
+    "audio/ogg": ".ogg",
+    "audio/mp4": ".mp4",
+}
+
+
+def _extension_audio(mime: str) -> str:
+    """
+    Extensión de archivo para el MIME de un audio grabado (default .webm).
+    Acepta el Content-Type ("audio/ogg;codecs=opus") o el header de un data
+    URL ("data:audio/ogg;codecs=opus;base64").
+    """
+    if mime.startswith("data:"):
+        mime = mime[5:]
+    return _EXTENSIONES_AUDIO.get(mime.split(";", 1)[0].strip().lower(), ".webm")
+
+
+def _publicar_staging(movimientos: list) -> None:
+    """
+    Mueve las evidencias de staging a su path definitivo con os.replace
+    (atómico) y hace un único fsync por directorio destino.
+    """
+    directorios = set()
+    for tmp_path, final_path in movimientos:
+        os.replace(tmp_path, final_path)
+        directorios.add(os.path.dirname(final_path))
+    if hasattr(os, "O_DIRECTORY"):
+        for d in directorios:
+            fd = os.open(d, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+
+def _leer_upload(upload: UploadFile, max_bytes: int) -> bytes:
+    """
+    Lee un UploadFile chico (firma, audio) a memoria, sin leer más de
+    max_bytes + 1 bytes. El llamador valida el tamaño con len().
+    """
+    upload.file.seek(0)
+    return upload.file.read(max_bytes + 1)
+
+
+# Largo máximo de "data:<mime>;base64," (el mime más largo usado es audio/webm;codecs=opus)
+_MAX_HEADER_DATA_URL = 128
+
+
+def _decodificar_data_url(valor: str) -> tuple:
+    """
+    Decodifica un data URL base64 ("data:<mime>;base64,<datos>") o base64 plano.
+    Retorna (header, bytes). Decodifica sobre un memoryview para no copiar
+    el payload con split() antes de b64decode.
+    """
+    raw = valor.encode("ascii")
+    # La coma solo puede estar en el header: no recorrer el payload de varios MB
+    # cuando llega base64 plano (el alfabeto base64 no incluye comas)
+    coma = raw.find(b",", 0, _MAX_HEADER_DATA_URL)
+    header = raw[:coma].decode("ascii") if coma >= 0 else ""
+    return header, b64decode(memoryview(raw)[coma + 1:])
+
+
+def _tamano_base64(valor: str) -> int:
+    """
+    Tamaño decodificado de un data URL base64 (o base64 plano), calculado
+    desde el largo del texto: permite rechazar un payload excesivo antes de
+    decodificarlo.
+    """
+    coma = valor.find(",", 0, _MAX_HEADER_DATA_URL)
+    return (len(valor) - coma - 1) * 3 // 4 - valor[-2:].count("=")
+
+
+def optimizar_firma_png(data: bytes) -> bytes:
+    """
+    Re-codifica la firma del canvas (trazo oscuro sobre fondo transparente/blanco)
+    como PNG de 1 bit con optimize=True. Si PIL no está disponible, falla, o el
+    resultado no es más chico, devuelve los bytes originales.
+    """
+    if not PIL_AVAILABLE:
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            if img.mode in ("RGBA", "LA", "P"):
+                # El canvas exporta fondo transparente: componer sobre blanco
+                rgba = img.convert("RGBA")
+                fondo = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+                fondo.alpha_composite(rgba)
+                img = fondo
+            bn = img.convert("L").point(lambda p: 0 if p < 200 else 255).convert("1")
+        out = io.BytesIO()
+        bn.save(out, format="PNG", optimize=True)
+        optimizada = out.getvalue()
+        return optimizada if len(optimizada) < len(data) else data
+    except Exception:
+        return data
+
+
+def _opciones_guardado(formato: str, quality: int) -> dict:
+    """Parámetros de Image.save(): JPEG con Huffman optimizado y progresivo."""
+    opciones = {"format": formato, "quality": quality, "optimize": True}
+    if formato == "JPEG":
+        opciones["progressive"] = True
+    return opciones
+
+
+def comprimir_imagen(data: bytes, max_size_mb: float = MAX_IMAGE_COMPRESS_TARGET_MB) -> Optional[bytes]:
     """
     Comprime una imagen si es posible usando PIL.
-    Retorna la ruta del archivo comprimido o None si no se pudo comprimir.
+    Limita la dimensión mayor a MAX_IMAGE_DIM y re-codifica (JPEG progresivo).
+    Trabaja en memoria: recibe los bytes originales y retorna los bytes a guardar
+    (los originales si re-codificar no achica), o None si no se pudo comprimir.
     Si PIL no está disponible, retorna None.
     """
     if not PIL_AVAILABLE:
@@ -110,19 +344,31 @@ def comprimir_imagen(file_path: str, max_size_mb: float = MAX_IMAGE_COMPRESS_TAR
 
     try:
         max_size_bytes = int(max_size_mb * 1024 * 1024)
+        original_size = len(data)
 
-        img = Image.open(file_path)
+        img = Image.open(io.BytesIO(data))
         original_format = img.format or 'JPEG'
+        if original_format == 'JPEG':
+            # Decodificar ya reducido (escala DCT 1/2, 1/4, 1/8) en vez de a resolución completa
+            img.draft('RGB', (MAX_IMAGE_DIM, MAX_IMAGE_DIM))
 
+        try:
+            resample = Image.Resampling.LANCZOS
+        except AttributeError:
+            resample = Image.LANCZOS
+
+        # Al re-codificar se pierde el EXIF: aplicar antes la orientación
+        img = ImageOps.exif_transpose(img)
         if original_format in ('JPEG', 'JPG') and img.mode != 'RGB':
             img = img.convert('RGB')
+        img.thumbnail((MAX_IMAGE_DIM, MAX_IMAGE_DIM), resample)
 
         buffer = io.BytesIO()
-        img.save(buffer, format=original_format, quality=85, optimize=True)
+        img.save(buffer, **_opciones_guardado(original_format, 85))
         current_size = buffer.tell()
 
         if current_size <= max_size_bytes:
-            return file_path
+            return buffer.getvalue() if current_size < original_size else data
 
         original_width, original_height = img.size
         ratio = (max_size_bytes / current_size) ** 0.5
@@ -137,48 +383,98 @@ def comprimir_imagen(file_path: str, max_size_mb: float = MAX_IMAGE_COMPRESS_TAR
                 new_height = 800
                 new_width = int(original_width * (800 / original_height))
 
-        try:
-            resample = Image.Resampling.LANCZOS
-        except AttributeError:
-            resample = Image.LANCZOS
         img_resized = img.resize((new_width, new_height), resample)
 
         for quality in [85, 75, 65, 55, 45]:
             buffer = io.BytesIO()
-            img_resized.save(buffer, format=original_format, quality=quality, optimize=True)
+            img_resized.save(buffer, **_opciones_guardado(original_format, quality))
             if buffer.tell() <= max_size_bytes:
-                with open(file_path, 'wb') as f:
-                    f.write(buffer.getvalue())
-                return file_path
+                return buffer.getvalue()
 
         buffer = io.BytesIO()
-        img_resized.save(buffer, format=original_format, quality=40, optimize=True)
+        img_resized.save(buffer, **_opciones_guardado(original_format, 40))
         if buffer.tell() <= max_size_bytes * 1.2:
-            with open(file_path, 'wb') as f:
-                f.write(buffer.getvalue())
-            return file_path
+            return buffer.getvalue()
 
         return None
     except Exception:
         return None
 
 
+# Placeholders de los textos de deslinde (grupo de captura: quedan en índices impares)
+_RE_PLACEHOLDERS_DESLINDE = re.compile(r"(\{\{NOMBRE_EVENTO\}\}|\{\{ORGANIZADOR\}\})")
+
+
+@lru_cache(maxsize=16)
+def _partes_deslinde_escapadas(texto_base: str) -> tuple:
+    """Divide el texto base por placeholders y escapa a HTML (una sola vez) los tramos fijos."""
+    partes = _RE_PLACEHOLDERS_DESLINDE.split(texto_base)
+    return tuple(p if i % 2 else str(escape(p)) for i, p in enumerate(partes))
+
+
+def deslinde_html(texto_base: str, nombre_evento: str, organizador: str) -> Markup:
+    """
+    Texto del deslinde listo para el template (Markup, Jinja no lo re-escapa).
+    Equivale a escape(texto_base.replace(...)) pero solo escapa los datos del evento.
+    """
+    valores = {
+        "{{NOMBRE_EVENTO}}": str(escape(nombre_evento)),
+        "{{ORGANIZADOR}}": str(escape(organizador)),
+    }
+    partes = _partes_deslinde_escapadas(texto_base)
+    return Markup("".join(valores[p] if i % 2 else p for i, p in enumerate(partes)))
+
+
+@lru_cache(maxsize=256)
+def hash_deslinde(version: str, deslinde_custom: Optional[str], nombre_evento: str, organizador: str) -> str:
+    """
+    SHA-256 del texto de deslinde que acepta el participante. El texto depende
+    solo de estos datos del evento, así que se calcula una vez por combinación
+    en lugar de leer el archivo legal y hashearlo en cada envío.
+    """
+    if deslinde_custom and deslinde_custom.strip():
+        texto_final = deslinde_custom
+    else:
+        texto_final = cargar_deslinde(version).replace("{{NOMBRE_EVENTO}}", nombre_evento)\
+                                              .replace("{{ORGANIZADOR}}", organizador)
+    return calcular_hash_sha256(texto_final)
+
+
 def _get_connection():
     """Obtiene una conexión a la base de datos (SQLite o PostgreSQL)."""
     from app.db.database import get_connection as _db_get_connection
     return _db_get_connection()
 
 
+def _db_connection():
+    """Conexión para un bloque `with`; al salir vuelve al pool (SQLite) o se cierra."""
+    from app.db.database import db_connection
+    return db_connection()
+
+
+def _escritura_sqlite(conn):
+    """Transacción de escritura serializada (ver app.db.database.escritura_sqlite)."""
+    from app.db.database import escritura_sqlite
+    return escritura_sqlite(conn)
+
+
 def get_evento(evento_id: int):
-    """Obtiene un evento por id."""
-    conn = _get_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM eventos WHERE id = %s", (evento_id,))
-        row = cur.fetchone()
-        return dict(row) if row else None
-    finally:
-        conn.close()
+    """
+    Obtiene un evento por id. Devuelve la fila tal cual (sqlite3.Row o dict en
+    PostgreSQL), sin copiarla a un dict: se accede por clave (evento["col"]).
+    """
+    with _db_connection() as conn:
+        return select_evento(conn, evento_id)
+
+
+def select_evento(conn, evento_id: int):
+    """Como get_evento, pero sobre una conexión ya abierta."""
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM eventos WHERE id = %s", (evento_id,))
+    return cur.fetchone()
+
+
+DETALLE_DUPLICADO = "Ya existe una aceptación registrada para este documento en este evento."
 
 
 def aceptacion_existente(conn, evento_id: int, documento_norm: str) -> bool:
@@ -195,7 +491,17 @@ def aceptacion_existente(conn, evento_id: int, documento_norm: str) -> bool:
     return cur.fetchone() is not None
 
 
+# Texto fijo: el cache de sentencias preparadas de cada conexión SQLite lo
+# parsea una sola vez (%s lo traduce el cursor compatible)
+SQL_INSERT_ACEPTACION = (
+    "INSERT INTO aceptaciones (evento_id, nombre_participante, documento, fecha_hora, ip, user_agent, deslinde_hash_sha256, firma_path, doc_frente_path, doc_dorso_path, audio_path, salud_doc_path, salud_doc_tipo, audio_exento, firma_asistida, pdf_token, documento_norm, deslinde_version, email) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+)
+SQL_INSERT_ACEPTACION_RETURNING = SQL_INSERT_ACEPTACION + " RETURNING id"
+
+
 def insertar_aceptacion(
+    conn,
     evento_id: int,
     nombre_participante: str,
     documento: str,
@@ -216,36 +522,24 @@ def insertar_aceptacion(
     deslinde_version: str = DEFAULT_DESLINDE_VERSION,
     email: Optional[str] = None,
 ) -> int:
-    """Inserta una aceptación y devuelve el ID creado."""
-    conn = _get_connection()
-    try:
-        from app.db.database import sql_placeholders, is_postgres_connection
-        cur = conn.cursor()
-        ph = sql_placeholders(19, conn)
-        params = (evento_id, nombre_participante, documento, fecha_hora, ip, user_agent, deslinde_hash_sha256, firma_path, doc_frente_path, doc_dorso_path, audio_path, salud_doc_path, salud_doc_tipo, audio_exento, firma_asistida, pdf_token, documento_norm, deslinde_version, email)
-        if is_postgres_connection(conn):
-            cur.execute(
-                f"INSERT INTO aceptaciones (evento_id, nombre_participante, documento, fecha_hora, ip, user_agent, deslinde_hash_sha256, firma_path, doc_frente_path, doc_dorso_path, audio_path, salud_doc_path, salud_doc_tipo, audio_exento, firma_asistida, pdf_token, documento_norm, deslinde_version, email) VALUES ({ph}) RETURNING id",
-                params,
-            )
-            row = cur.fetchone()
-            new_id = row['id'] if row else None
-        else:
-            cur.execute(
-                f"INSERT INTO aceptaciones (evento_id, nombre_participante, documento, fecha_hora, ip, user_agent, deslinde_hash_sha256, firma_path, doc_frente_path, doc_dorso_path, audio_path, salud_doc_path, salud_doc_tipo, audio_exento, firma_asistida, pdf_token, documento_norm, deslinde_version, email) VALUES ({ph})",
-                params,
-            )
-            new_id = cur.lastrowid
-        conn.commit()
-        return new_id
-    finally:
-        conn.close()
+    """
+    Inserta una aceptación y devuelve el ID creado. No hace commit: la
+    transacción la maneja quien llama.
+    """
+    from app.db.database import is_postgres_connection
+    cur = conn.cursor()
+    params = (evento_id, nombre_participante, documento, fecha_hora, ip, user_agent, deslinde_hash_sha256, firma_path, doc_frente_path, doc_dorso_path, audio_path, salud_doc_path, salud_doc_tipo, audio_exento, firma_asistida, pdf_token, documento_norm, deslinde_version, email)
+    if is_postgres_connection(conn):
+        cur.execute(SQL_INSERT_ACEPTACION_RETURNING, params)
+        row = cur.fetchone()
+        return row['id'] if row else None
+    cur.execute(SQL_INSERT_ACEPTACION, params)
+    return cur.lastrowid
 
 
 def get_aceptacion_por_token(pdf_token: str):
     """Obtiene aceptación por token público."""
-    conn = _get_connection()
-    try:
+    with _db_connection() as conn:
         cur = conn.cursor()
         cur.execute(
             """
@@ -284,28 +578,27 @@ def get_aceptacion_por_token(pdf_token: str):
         if not row:
             return None
         return dict(row)
-    finally:
-        conn.close()
 
 
 def registrar_acceso_pdf(aceptacion_id: int):
     """Registra un acceso exitoso al PDF."""
     conn = _get_connection()
     try:
-        cur = conn.cursor()
-        now_utc = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-        cur.execute(
-            """
-            UPDATE aceptaciones
-            SET pdf_last_access_at = %s,
-                pdf_access_count = COALESCE(pdf_access_count, 0) + 1
-            WHERE id = %s
-            """,
-            (now_utc, aceptacion_id)
-        )
-        conn.commit()
+        with _escritura_sqlite(conn):
+            cur = conn.cursor()
+            now_utc = ahora_utc_iso()
+            cur.execute(
+                """
+                UPDATE aceptaciones
+                SET pdf_last_access_at = %s,
+                    pdf_access_count = COALESCE(pdf_access_count, 0) + 1
+                WHERE id = %s
+                """,
+                (now_utc, aceptacion_id)
+            )
+            conn.commit()
     except Exception as e:
-        app_logger.error(f"Error registrando acceso PDF id={aceptacion_id}: {e}")
+        app_logger.error("Error registrando acceso PDF id=%s: %s", aceptacion_id, e)
     finally:
         conn.close()
 
@@ -314,6 +607,30 @@ def registrar_acceso_pdf(aceptacion_id: int):
 # Rutas públicas
 # ------------------------------------------------------------------------------
 
+# HTML del formulario ya renderizado, por (evento_id, path). El render depende
+# solo de la fila del evento (y del texto legal, fijo por proceso): se guarda
+# junto con los valores de la fila y se reutiliza mientras no cambien, así una
+# edición del evento invalida la entrada sin tener que avisarle a este módulo.
+_CACHE_FORMULARIO: dict = {}
+_MAX_CACHE_FORMULARIO = 256
+# El navegador puede guardar la página pero debe revalidarla (If-None-Match)
+CACHE_CONTROL_FORMULARIO = "private, no-cache"
+
+
+def _valores_fila(fila) -> tuple:
+    """Valores de una fila como tupla comparable (sqlite3.Row o dict de psycopg)."""
+    return tuple(fila.values()) if isinstance(fila, dict) else tuple(fila)
+
+
+def _etag_coincide(request: Request, etag: str) -> bool:
+    """True si el If-None-Match del navegador incluye el ETag (comparación débil)."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    etiquetas = [e.strip().removeprefix("W/") for e in if_none_match.split(",")]
+    return "*" in etiquetas or etag.removeprefix("W/") in etiquetas
+
+
 @router.get("/e/{evento_id}", response_class=HTMLResponse)
 def mostrar_formulario(evento_id: int, request: Request) -> HTMLResponse:
     """
@@ -325,24 +642,30 @@ def mostrar_formulario(evento_id: int, request: Request) -> HTMLResponse:
     evento = get_evento(evento_id)
     if not evento:
         raise HTTPException(status_code=404, detail="Evento no encontrado")
-    evento["activo"] = bool(evento["activo"])
-    evento["req_firma"] = bool(evento.get("req_firma", 0))
-    evento["req_documento"] = bool(evento.get("req_documento", 0))
-    evento["req_audio"] = bool(evento.get("req_audio", 0))
-    evento["req_salud"] = bool(evento.get("req_salud", 0))
-    evento["friendly_intro"] = bool(evento.get("friendly_intro", 0))  # DESLINDE PATCH: friendly intro
-
-    # Obtener texto del deslinde
-    deslinde_custom = evento.get("deslinde_texto")
+
+    path = request.url.path
+    valores = _valores_fila(evento)
+    cacheado = _CACHE_FORMULARIO.get((evento_id, path))
+    if cacheado is not None and cacheado[0] == valores:
+        _, html, etag = cacheado
+        # Sin cambios desde la última visita (volver atrás, recargar): 304 sin body
+        if _etag_coincide(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL_FORMULARIO})
+        return HTMLResponse(content=html, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL_FORMULARIO})
+
+    # Las banderas (activo, req_*, friendly_intro) son 0/1/NULL: el template
+    # las evalúa por verdad, no hace falta convertirlas a bool.
+
+    # Obtener texto del deslinde (ya escapado a HTML)
+    deslinde_custom = evento["deslinde_texto"]
     if deslinde_custom and deslinde_custom.strip():
-        texto_final = deslinde_custom
+        texto_final = escape(deslinde_custom)
     else:
-        version = evento.get("deslinde_version") or DEFAULT_DESLINDE_VERSION
+        version = evento["deslinde_version"] or DEFAULT_DESLINDE_VERSION
         texto_base = cargar_deslinde(version)
-        texto_final = texto_base.replace("{{NOMBRE_EVENTO}}", evento["nombre"])\
-                                .replace("{{ORGANIZADOR}}", evento["organizador"])
+        texto_final = deslinde_html(texto_base, evento["nombre"], evento["organizador"])
 
-    template = templates_env.get_template("evento_form.html")
+    template = _TPL_EVENTO_FORM
     html = template.render(
         evento=evento,
         request=request,
@@ -351,8 +674,17 @@ def mostrar_formulario(evento_id: int, request: Request) -> HTMLResponse:
         MAX_FIRMA_MB=MAX_FIRMA_MB,
         MAX_AUDIO_MB=MAX_AUDIO_MB,
         MAX_IMAGE_COMPRESS_THRESHOLD_MB=MAX_IMAGE_COMPRESS_THRESHOLD_MB
-    )
-    return HTMLResponse(content=html)
+    ).encode("utf-8")
+
+    # ETag débil: Nginx lo conserva al comprimir con gzip
+    etag = f'W/"{hashlib.blake2s(html, digest_size=8).hexdigest()}"'
+
+    if len(_CACHE_FORMULARIO) >= _MAX_CACHE_FORMULARIO:
+        _CACHE_FORMULARIO.clear()
+    _CACHE_FORMULARIO[(evento_id, path)] = (valores, html, etag)
+    if _etag_coincide(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL_FORMULARIO})
+    return HTMLResponse(content=html, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL_FORMULARIO})
 
 
 @router.post("/e/{evento_id}", response_class=HTMLResponse)
@@ -364,10 +696,12 @@ def procesar_aceptacion(
     email: Optional[str] = Form(None),
     acepto: Optional[str] = Form(None),
     firma_base64: Optional[str] = Form(None),
+    firma_file: Optional[UploadFile] = File(None),
     doc_frente: Optional[UploadFile] = File(None),
     doc_dorso: Optional[UploadFile] = File(None),
     salud_doc: Optional[UploadFile] = File(None),
     audio_base64: Optional[str] = Form(None),
+    audio_file: Optional[UploadFile] = File(None),
     salud_doc_tipo: Optional[str] = Form(None),
     audio_exento: Optional[int] = Form(0),
     firma_asistida: Optional[int] = Form(0),
@@ -380,32 +714,41 @@ def procesar_aceptacion(
     - Normaliza documento
     - Usa fecha/hora UTC con sufijo 'Z'
     - Asocia el hash del deslinde activo aceptado
-    - Guarda firma manuscrita si el evento lo requiere
+    - Guarda firma manuscrita si el evento lo requiere (archivo PNG binario
+      en firma_file; firma_base64 se mantiene como fallback)
     - Guarda imágenes de documento si el evento lo requiere
-    - Guarda audio de aceptación si el evento lo requiere
+    - Guarda audio de aceptación si el evento lo requiere (archivo binario en
+      audio_file; audio_base64 se mantiene como fallback)
     - Renderiza confirmación
     """
     request_id = str(uuid.uuid4())[:8]
+    staging_dir = None
+    conn = None
+    bitacora = BitacoraRequest(request_id)
 
     try:
-        app_logger.info(f"[{request_id}] Inicio procesamiento aceptación - evento_id={evento_id}")
+        bitacora.info("Inicio procesamiento aceptación - evento_id=%s", evento_id)
 
-        evento = get_evento(evento_id)
+        # Una sola conexión para todo el envío: lectura del evento, chequeo de
+        # duplicado e INSERT final.
+        conn = _get_connection()
+        evento = select_evento(conn, evento_id)
         if not evento:
-            app_logger.warning(f"[{request_id}] Evento no encontrado: evento_id={evento_id}")
+            app_logger.warning("[%s] Evento no encontrado: evento_id=%s", request_id, evento_id)
             raise HTTPException(status_code=404, detail="Evento no encontrado")
         if not bool(evento["activo"]):
-            app_logger.warning(f"[{request_id}] Evento inactivo: evento_id={evento_id}")
+            app_logger.warning("[%s] Evento inactivo: evento_id=%s", request_id, evento_id)
             raise HTTPException(status_code=400, detail="Evento inactivo")
         if acepto is None:
-            app_logger.warning(f"[{request_id}] Checkbox acepto no marcado")
+            app_logger.warning("[%s] Checkbox acepto no marcado", request_id)
             raise HTTPException(status_code=400, detail="Debe aceptar el deslinde")
 
-        req_firma = bool(evento.get("req_firma", 0))
-        if req_firma and not firma_base64:
+        tiene_firma_file = bool(firma_file and firma_file.filename)
+        req_firma = bool(evento["req_firma"])
+        if req_firma and not (tiene_firma_file or firma_base64):
             raise HTTPException(status_code=400, detail="La firma manuscrita es obligatoria")
 
-        req_documento = bool(evento.get("req_documento", 0))
+        req_documento = bool(evento["req_documento"])
         if req_documento:
             if not doc_frente or not doc_frente.filename:
                 raise HTTPException(status_code=400, detail="La foto del frente del documento es obligatoria")
@@ -413,13 +756,8 @@ def procesar_aceptacion(
                 raise HTTPException(status_code=400, detail="La foto del dorso del documento es obligatoria")
 
             try:
-                doc_frente.file.seek(0, os.SEEK_END)
-                size_frente = doc_frente.file.tell()
-                doc_frente.file.seek(0)
-
-                doc_dorso.file.seek(0, os.SEEK_END)
-                size_dorso = doc_dorso.file.tell()
-                doc_dorso.file.seek(0)
+                size_frente = _tamano_upload(doc_frente)
+                size_dorso = _tamano_upload(doc_dorso)
 
                 max_bytes_img = MAX_IMAGE_DOC_MB * 1024 * 1024
                 if size_frente > max_bytes_img or size_dorso > max_bytes_img:
@@ -432,16 +770,14 @@ def procesar_aceptacion(
             except Exception:
                 pass
 
-        req_salud = bool(evento.get("req_salud", 0))
+        req_salud = bool(evento["req_salud"])
         if req_salud:
             if not salud_doc or not salud_doc.filename:
                 raise HTTPException(status_code=400, detail="El documento de salud es obligatorio")
             if not salud_doc_tipo:
                 raise HTTPException(status_code=400, detail="Debe seleccionar el tipo de documento de salud")
             try:
-                salud_doc.file.seek(0, os.SEEK_END)
-                salud_size = salud_doc.file.tell()
-                salud_doc.file.seek(0)
+                salud_size = _tamano_upload(salud_doc)
                 max_bytes_img = MAX_IMAGE_DOC_MB * 1024 * 1024
                 if salud_size > max_bytes_img:
                     raise HTTPException(
@@ -453,68 +789,66 @@ def procesar_aceptacion(
             except Exception:
                 pass
 
-        req_audio = bool(evento.get("req_audio", 0))
+        req_audio = bool(evento["req_audio"])
         if req_audio:
             if audio_exento == 1:
-                app_logger.info(f"[{request_id}] Audio exento por imposibilidad física")
-            elif not audio_base64:
+                bitacora.info("Audio exento por imposibilidad física")
+            elif not (audio_file and audio_file.filename) and not audio_base64:
                 raise HTTPException(status_code=400, detail="El audio de aceptación es obligatorio")
 
         ip = request.client.host if request.client else "0.0.0.0"
         user_agent = request.headers.get("user-agent", "")
-        fecha_hora = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+        fecha_hora = ahora_utc_iso()
         documento_norm = normalizar_documento_helper(documento)
 
-        conn = _get_connection()
-        try:
-            if aceptacion_existente(conn, evento_id, documento_norm):
-                app_logger.warning(f"[{request_id}] Intento de duplicado bloqueado: evento={evento_id}, doc={documento_norm}")
-                raise HTTPException(status_code=400, detail="Ya existe una aceptación registrada para este documento en este evento.")
-        finally:
-            conn.close()
+        if aceptacion_existente(conn, evento_id, documento_norm):
+            app_logger.warning("[%s] Intento de duplicado bloqueado: evento=%s, doc=%s", request_id, evento_id, documento_norm)
+            raise HTTPException(status_code=400, detail=DETALLE_DUPLICADO)
+        # Cerrar la transacción de lectura (PostgreSQL) antes de procesar evidencias
+        conn.rollback()
 
-        deslinde_custom = evento.get("deslinde_texto")
-        if deslinde_custom and deslinde_custom.strip():
-            texto_final = deslinde_custom
-            version = evento.get("deslinde_version") or DEFAULT_DESLINDE_VERSION
-        else:
-            version = evento.get("deslinde_version") or DEFAULT_DESLINDE_VERSION
-            texto_base = cargar_deslinde(version)
-            texto_final = texto_base.replace("{{NOMBRE_EVENTO}}", evento["nombre"])\
-                                    .replace("{{ORGANIZADOR}}", evento["organizador"])
+        version = evento["deslinde_version"] or DEFAULT_DESLINDE_VERSION
+        deslinde_hash_sha256 = hash_deslinde(
+            version, evento["deslinde_texto"], evento["nombre"], evento["organizador"]
+        )
+
+        # Las evidencias se escriben en un directorio de staging propio del
+        # request; los *_path_final son los paths definitivos que van a la DB.
+        staging_dir = tempfile.mkdtemp(prefix=f"{request_id}-", dir=STAGING_DIR)
 
-        deslinde_hash_sha256 = calcular_hash_sha256(texto_final)
+        def _en_staging(final_path: str) -> str:
+            return os.path.join(staging_dir, os.path.basename(final_path))
 
         # Procesamiento de firma
         firma_path_final = None
-        if firma_base64:
-            if "," in firma_base64:
-                header, encoded = firma_base64.split(",", 1)
-            else:
-                encoded = firma_base64
-
+        if tiene_firma_file or firma_base64:
             try:
-                data = base64.b64decode(encoded)
-
-                firma_size = len(data)
                 max_firma_bytes = MAX_FIRMA_MB * 1024 * 1024
+                if tiene_firma_file:
+                    data = _leer_upload(firma_file, max_firma_bytes)
+                    firma_size = len(data)
+                else:
+                    firma_size = _tamano_base64(firma_base64)
+
                 if firma_size > max_firma_bytes:
-                    app_logger.warning(f"[{request_id}] Firma demasiado grande: {firma_size} bytes")
+                    app_logger.warning("[%s] Firma demasiado grande: %s bytes", request_id, firma_size)
                     raise HTTPException(
                         status_code=413,
                         detail=f"La firma es demasiado grande. Máximo permitido: {MAX_FIRMA_MB} MB. Por favor, firme más pequeña."
                     )
+                if not tiene_firma_file:
+                    _, data = _decodificar_data_url(firma_base64)
 
+                data = optimizar_firma_png(data)
                 filename = f"{uuid.uuid4()}.png"
                 filepath = os.path.join(FIRMAS_DIR, filename)
-                with open(filepath, "wb") as f:
-                    f.write(data)
+                _escribir_archivo(_en_staging(filepath), data)
                 firma_path_final = filepath
-                app_logger.info(f"[{request_id}] Firma guardada: path={filepath}, size={firma_size} bytes")
+                bitacora.info("Firma guardada: path=%s, size=%s -> %s bytes", filepath, firma_size, len(data))
             except HTTPException:
                 raise
             except Exception as _firma_exc:
-                app_logger.error(f"[{request_id}] Error guardando firma en {FIRMAS_DIR}: {_firma_exc}", exc_info=True)
+                app_logger.error("[%s] Error guardando firma en %s: %s", request_id, FIRMAS_DIR, _firma_exc, exc_info=True)
                 if req_firma:
                     raise HTTPException(status_code=500, detail="Error al guardar la firma")
 
@@ -526,21 +860,17 @@ def procesar_aceptacion(
             try:
                 max_doc_bytes = MAX_IMAGE_DOC_MB * 1024 * 1024
 
-                doc_frente.file.seek(0, os.SEEK_END)
-                size_frente = doc_frente.file.tell()
-                doc_frente.file.seek(0)
+                size_frente = _tamano_upload(doc_frente)
                 if size_frente > max_doc_bytes:
-                    app_logger.warning(f"[{request_id}] Doc frente demasiado grande: {size_frente} bytes")
+                    app_logger.warning("[%s] Doc frente demasiado grande: %s bytes", request_id, size_frente)
                     raise HTTPException(
                         status_code=413,
                         detail=f"La imagen del frente es demasiado grande. Máximo permitido: {MAX_IMAGE_DOC_MB} MB."
                     )
 
-                doc_dorso.file.seek(0, os.SEEK_END)
-                size_dorso = doc_dorso.file.tell()
-                doc_dorso.file.seek(0)
+                size_dorso = _tamano_upload(doc_dorso)
                 if size_dorso > max_doc_bytes:
-                    app_logger.warning(f"[{request_id}] Doc dorso demasiado grande: {size_dorso} bytes")
+                    app_logger.warning("[%s] Doc dorso demasiado grande: %s bytes", request_id, size_dorso)
                     raise HTTPException(
                         status_code=413,
                         detail=f"La imagen del dorso es demasiado grande. Máximo permitido: {MAX_IMAGE_DOC_MB} MB."
@@ -550,67 +880,46 @@ def procesar_aceptacion(
                 if not ext_frente: ext_frente = ".jpg"
                 filename_frente = f"{uuid.uuid4()}_frente{ext_frente}"
                 filepath_frente = os.path.join(DOCUMENTOS_DIR, filename_frente)
-                with open(filepath_frente, "wb") as buffer:
-                    shutil.copyfileobj(doc_frente.file, buffer)
-
-                if size_frente > MAX_IMAGE_COMPRESS_THRESHOLD_MB * 1024 * 1024:
-                    app_logger.info(f"[{request_id}] Comprimiendo doc frente: {size_frente} bytes")
-                    compressed = comprimir_imagen(filepath_frente, MAX_IMAGE_COMPRESS_TARGET_MB)
-                    if not compressed:
-                        os.remove(filepath_frente)
-                        app_logger.error(f"[{request_id}] No se pudo comprimir doc frente")
-                        raise HTTPException(
-                            status_code=413,
-                            detail=f"La imagen del frente es demasiado grande y no se pudo comprimir. Máximo permitido: {MAX_IMAGE_DOC_MB} MB."
-                        )
-                    final_size_frente = os.path.getsize(filepath_frente)
-                    app_logger.info(f"[{request_id}] Doc frente comprimido: {size_frente} -> {final_size_frente} bytes")
-                else:
-                    final_size_frente = size_frente
-
-                doc_frente_path_final = filepath_frente
-                app_logger.info(f"[{request_id}] Doc frente guardado: path={filepath_frente}, size={final_size_frente} bytes")
 
                 ext_dorso = os.path.splitext(doc_dorso.filename)[1]
                 if not ext_dorso: ext_dorso = ".jpg"
                 filename_dorso = f"{uuid.uuid4()}_dorso{ext_dorso}"
                 filepath_dorso = os.path.join(DOCUMENTOS_DIR, filename_dorso)
-                with open(filepath_dorso, "wb") as buffer:
-                    shutil.copyfileobj(doc_dorso.file, buffer)
-
-                if size_dorso > MAX_IMAGE_COMPRESS_THRESHOLD_MB * 1024 * 1024:
-                    app_logger.info(f"[{request_id}] Comprimiendo doc dorso: {size_dorso} bytes")
-                    compressed = comprimir_imagen(filepath_dorso, MAX_IMAGE_COMPRESS_TARGET_MB)
-                    if not compressed:
-                        os.remove(filepath_dorso)
-                        if doc_frente_path_final and os.path.exists(doc_frente_path_final):
-                            os.remove(doc_frente_path_final)
-                        app_logger.error(f"[{request_id}] No se pudo comprimir doc dorso")
-                        raise HTTPException(
-                            status_code=413,
-                            detail=f"La imagen del dorso es demasiado grande y no se pudo comprimir. Máximo permitido: {MAX_IMAGE_DOC_MB} MB."
-                        )
-                    final_size_dorso = os.path.getsize(filepath_dorso)
-                    app_logger.info(f"[{request_id}] Doc dorso comprimido: {size_dorso} -> {final_size_dorso} bytes")
-                else:
-                    final_size_dorso = size_dorso
 
+                # El frente se guarda (y comprime) en el pool mientras este
+                # thread hace lo mismo con el dorso
+                futuro_frente = POOL_COMPRESION.submit(_guardar_imagen, doc_frente, _en_staging(filepath_frente), size_frente)
+                try:
+                    final_size_dorso, sha_dorso = _guardar_imagen(doc_dorso, _en_staging(filepath_dorso), size_dorso)
+                finally:
+                    # No dejar la escritura del frente corriendo sobre el staging
+                    final_size_frente, sha_frente = futuro_frente.result()
+
+                if final_size_frente is None:
+                    app_logger.error("[%s] No se pudo comprimir doc frente", request_id)
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"La imagen del frente es demasiado grande y no se pudo comprimir. Máximo permitido: {MAX_IMAGE_DOC_MB} MB."
+                    )
+                if final_size_frente != size_frente:
+                    bitacora.info("Doc frente comprimido: %s -> %s bytes", size_frente, final_size_frente)
+                doc_frente_path_final = filepath_frente
+                bitacora.info("Doc frente guardado: path=%s, size=%s bytes, sha256_original=%s", filepath_frente, final_size_frente, sha_frente)
+
+                if final_size_dorso is None:
+                    app_logger.error("[%s] No se pudo comprimir doc dorso", request_id)
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"La imagen del dorso es demasiado grande y no se pudo comprimir. Máximo permitido: {MAX_IMAGE_DOC_MB} MB."
+                    )
+                if final_size_dorso != size_dorso:
+                    bitacora.info("Doc dorso comprimido: %s -> %s bytes", size_dorso, final_size_dorso)
                 doc_dorso_path_final = filepath_dorso
-                app_logger.info(f"[{request_id}] Doc dorso guardado: path={filepath_dorso}, size={final_size_dorso} bytes")
+                bitacora.info("Doc dorso guardado: path=%s, size=%s bytes, sha256_original=%s", filepath_dorso, final_size_dorso, sha_dorso)
 
             except HTTPException:
                 raise
-            except Exception as e:
-                if doc_frente_path_final and os.path.exists(doc_frente_path_final):
-                    try:
-                        os.remove(doc_frente_path_final)
-                    except Exception:
-                        pass
-                if doc_dorso_path_final and os.path.exists(doc_dorso_path_final):
-                    try:
-                        os.remove(doc_dorso_path_final)
-                    except Exception:
-                        pass
+            except Exception:
                 raise HTTPException(status_code=500, detail="Error al guardar las imágenes del documento")
 
         salud_doc_path_final = None
@@ -618,11 +927,9 @@ def procesar_aceptacion(
             try:
                 max_doc_bytes = MAX_IMAGE_DOC_MB * 1024 * 1024
 
-                salud_doc.file.seek(0, os.SEEK_END)
-                salud_size = salud_doc.file.tell()
-                salud_doc.file.seek(0)
+                salud_size = _tamano_upload(salud_doc)
                 if salud_size > max_doc_bytes:
-                    app_logger.warning(f"[{request_id}] Doc salud demasiado grande: {salud_size} bytes")
+                    app_logger.warning("[%s] Doc salud demasiado grande: %s bytes", request_id, salud_size)
                     raise HTTPException(
                         status_code=413,
                         detail=f"El documento de salud es demasiado grande. Máximo permitido: {MAX_IMAGE_DOC_MB} MB."
@@ -633,109 +940,118 @@ def procesar_aceptacion(
                     ext_salud = ".jpg"
                 filename_salud = f"{uuid.uuid4()}{ext_salud}"
                 filepath_salud = os.path.join(SALUD_DIR, filename_salud)
-                with open(filepath_salud, "wb") as buffer:
-                    shutil.copyfileobj(salud_doc.file, buffer)
-
-                if salud_size > MAX_IMAGE_COMPRESS_THRESHOLD_MB * 1024 * 1024:
-                    app_logger.info(f"[{request_id}] Comprimiendo doc salud: {salud_size} bytes")
-                    compressed = comprimir_imagen(filepath_salud, MAX_IMAGE_COMPRESS_TARGET_MB)
-                    if not compressed:
-                        os.remove(filepath_salud)
-                        app_logger.error(f"[{request_id}] No se pudo comprimir doc salud")
-                        raise HTTPException(
-                            status_code=413,
-                            detail=f"El documento de salud es demasiado grande y no se pudo comprimir. Máximo permitido: {MAX_IMAGE_DOC_MB} MB."
-                        )
-                    final_size_salud = os.path.getsize(filepath_salud)
-                    app_logger.info(f"[{request_id}] Doc salud comprimido: {salud_size} -> {final_size_salud} bytes")
-                else:
-                    final_size_salud = salud_size
+                final_size_salud, sha_salud = _guardar_imagen(salud_doc, _en_staging(filepath_salud), salud_size)
+                if final_size_salud is None:
+                    app_logger.error("[%s] No se pudo comprimir doc salud", request_id)
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"El documento de salud es demasiado grande y no se pudo comprimir. Máximo permitido: {MAX_IMAGE_DOC_MB} MB."
+                    )
+                if final_size_salud != salud_size:
+                    bitacora.info("Doc salud comprimido: %s -> %s bytes", salud_size, final_size_salud)
 
                 salud_doc_path_final = filepath_salud
-                app_logger.info(f"[{request_id}] Doc salud guardado: path={filepath_salud}, size={final_size_salud} bytes")
+                bitacora.info("Doc salud guardado: path=%s, size=%s bytes, sha256_original=%s", filepath_salud, final_size_salud, sha_salud)
             except HTTPException:
                 raise
             except Exception:
-                if salud_doc_path_final and os.path.exists(salud_doc_path_final):
-                    try:
-                        os.remove(salud_doc_path_final)
-                    except Exception:
-                        pass
                 raise HTTPException(status_code=500, detail="Error al guardar el documento de salud")
 
         # Procesamiento de audio
         audio_path_final = None
-        if audio_base64:
-            header = ""
-            if "," in audio_base64:
-                header, encoded = audio_base64.split(",", 1)
-            else:
-                encoded = audio_base64
-
+        if audio_file and audio_file.filename:
+            try:
+                ext = _extension_audio(audio_file.content_type or "")
+                filename_audio = f"{uuid.uuid4()}{ext}"
+                filepath_audio = os.path.join(AUDIOS_DIR, filename_audio)
+                audio_size, _ = _guardar_upload(audio_file, _en_staging(filepath_audio), MAX_AUDIO_MB * 1024 * 1024)
+                audio_path_final = filepath_audio
+                bitacora.info("Audio guardado: path=%s, size=%s bytes", filepath_audio, audio_size)
+            except HTTPException:
+                app_logger.warning("[%s] Audio demasiado grande", request_id)
+                raise
+            except Exception:
+                if req_audio and audio_exento != 1:
+                    raise HTTPException(status_code=500, detail="Error al guardar el audio")
+                app_logger.exception("[%s] Error no bloqueante al guardar audio", request_id)
+        elif audio_base64:
             try:
-                data = base64.b64decode(encoded)
-
                 max_audio_bytes = MAX_AUDIO_MB * 1024 * 1024
-                audio_size = len(data)
+                audio_size = _tamano_base64(audio_base64)
                 if audio_size > max_audio_bytes:
-                    app_logger.warning(f"[{request_id}] Audio demasiado grande: {audio_size} bytes")
+                    app_logger.warning("[%s] Audio demasiado grande: %s bytes", request_id, audio_size)
                     raise HTTPException(
                         status_code=413,
                         detail=f"El audio es demasiado grande. Máximo permitido: {MAX_AUDIO_MB} MB. Por favor, intente ser más breve."
                     )
 
-                ext = ".webm"
-                if "audio/mp3" in header: ext = ".mp3"
-                elif "audio/wav" in header: ext = ".wav"
-                elif "audio/ogg" in header: ext = ".ogg"
-                elif "audio/mp4" in header: ext = ".mp4"
+                header, data = _decodificar_data_url(audio_base64)
+                ext = _extension_audio(header)
 
                 filename_audio = f"{uuid.uuid4()}{ext}"
                 filepath_audio = os.path.join(AUDIOS_DIR, filename_audio)
-                with open(filepath_audio, "wb") as f:
-                    f.write(data)
+                _escribir_archivo(_en_staging(filepath_audio), data)
                 audio_path_final = filepath_audio
-                app_logger.info(f"[{request_id}] Audio guardado: path={filepath_audio}, size={audio_size} bytes")
+                bitacora.info("Audio guardado: path=%s, size=%s bytes", filepath_audio, audio_size)
             except HTTPException:
                 raise
             except Exception:
                 if req_audio and audio_exento != 1:
                     raise HTTPException(status_code=500, detail="Error al guardar el audio")
-                app_logger.error(f"[{request_id}] Error no bloqueante al guardar audio: {traceback.format_exc()}")
+                app_logger.exception("[%s] Error no bloqueante al guardar audio", request_id)
 
         # Generar token público para descarga de PDF
         pdf_token = secrets.token_urlsafe(32)
 
-        aceptacion_id = insertar_aceptacion(
-            evento_id=evento_id,
-            nombre_participante=nombre_participante.strip(),
-            documento=documento.strip(),
-            fecha_hora=fecha_hora,
-            ip=ip,
-            user_agent=user_agent,
-            deslinde_hash_sha256=deslinde_hash_sha256,
-            firma_path=firma_path_final,
-            doc_frente_path=doc_frente_path_final,
-            doc_dorso_path=doc_dorso_path_final,
-            audio_path=audio_path_final,
-            salud_doc_path=salud_doc_path_final,
-            salud_doc_tipo=salud_doc_tipo,
-            audio_exento=audio_exento or 0,
-            firma_asistida=firma_asistida or 0,
-            pdf_token=pdf_token,
-            documento_norm=documento_norm,
-            deslinde_version=version,
-            email=email.strip().lower() if email and email.strip() else None,
-        )
-
-        app_logger.info(
-            f"[{request_id}] Aceptación guardada exitosamente - "
-            f"aceptacion_id={aceptacion_id}, evento_id={evento_id}, pdf_token={pdf_token[:8]}..., "
-            f"firma_path={firma_path_final}, doc_frente_path={doc_frente_path_final}, "
-            f"doc_dorso_path={doc_dorso_path_final}, audio_path={audio_path_final}, salud_doc_path={salud_doc_path_final}"
+        # Re-chequeo de duplicado + INSERT en una transacción. En SQLite,
+        # BEGIN IMMEDIATE toma el lock de escritura antes de leer: dos envíos
+        # simultáneos del mismo documento no pueden pasar ambos el chequeo.
+        with _escritura_sqlite(conn):
+            if aceptacion_existente(conn, evento_id, documento_norm):
+                conn.rollback()
+                app_logger.warning("[%s] Duplicado detectado al insertar: evento=%s, doc=%s", request_id, evento_id, documento_norm)
+                raise HTTPException(status_code=400, detail=DETALLE_DUPLICADO)
+            aceptacion_id = insertar_aceptacion(
+                conn,
+                evento_id=evento_id,
+                nombre_participante=nombre_participante.strip(),
+                documento=documento.strip(),
+                fecha_hora=fecha_hora,
+                ip=ip,
+                user_agent=user_agent,
+                deslinde_hash_sha256=deslinde_hash_sha256,
+                firma_path=firma_path_final,
+                doc_frente_path=doc_frente_path_final,
+                doc_dorso_path=doc_dorso_path_final,
+                audio_path=audio_path_final,
+                salud_doc_path=salud_doc_path_final,
+                salud_doc_tipo=salud_doc_tipo,
+                audio_exento=audio_exento or 0,
+                firma_asistida=firma_asistida or 0,
+                pdf_token=pdf_token,
+                documento_norm=documento_norm,
+                deslinde_version=version,
+                email=email.strip().lower() if email and email.strip() else None,
+            )
+            conn.commit()
+        _publicar_staging([
+            (_en_staging(path), path)
+            for path in (firma_path_final, doc_frente_path_final, doc_dorso_path_final,
+                         audio_path_final, salud_doc_path_final)
+            if path
+        ])
+
+        bitacora.emitir(
+            "Aceptación guardada exitosamente - "
+            "aceptacion_id=%s, evento_id=%s, pdf_token=%s..., "
+            "firma_path=%s, doc_frente_path=%s, "
+            "doc_dorso_path=%s, audio_path=%s, salud_doc_path=%s",
+            aceptacion_id, evento_id, pdf_token[:8],
+            firma_path_final, doc_frente_path_final,
+            doc_dorso_path_final, audio_path_final, salud_doc_path_final,
         )
 
-        template = templates_env.get_template("confirmacion.html")
+        template = _TPL_CONFIRMACION
         html = template.render(
             nombre_participante=nombre_participante,
             evento=evento,
@@ -747,11 +1063,19 @@ def procesar_aceptacion(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(
-            f"[{request_id}] Excepción en procesar_aceptacion - evento_id={evento_id}: {str(e)}\n"
-            f"{traceback.format_exc()}"
+        app_logger.exception(
+            "[%s] Excepción en procesar_aceptacion - evento_id=%s: %s", request_id, evento_id, e
         )
         raise HTTPException(status_code=500, detail="Error interno del servidor")
+    finally:
+        # Si no se llegó a guardar, igual queda registro de lo que se hizo
+        bitacora.emitir("Procesamiento interrumpido - evento_id=%s", evento_id)
+        # Sin commit, close() descarta la transacción abierta
+        if conn is not None:
+            conn.close()
+        # Lo que quede en staging (error o evidencia descartada) se elimina
+        if staging_dir:
+            shutil.rmtree(staging_dir, ignore_errors=True)
 
 
 def _validar_recarga_token(token: str):
@@ -759,8 +1083,7 @@ def _validar_recarga_token(token: str):
     Busca y valida un recarga_token. Devuelve dict con aceptacion+evento o
     lanza HTTPException con el código apropiado.
     """
-    conn = _get_connection()
-    try:
+    with _db_connection() as conn:
         cur = conn.cursor()
         cur.execute(
             """
@@ -778,8 +1101,6 @@ def _validar_recarga_token(token: str):
             (token,),
         )
         row = cur.fetchone()
-    finally:
-        conn.close()
 
     if not row:
         raise HTTPException(status_code=404, detail="Link inválido o no encontrado")
@@ -812,7 +1133,7 @@ def _imagen_a_data_uri(path: Optional[str]) -> Optional[str]:
         ext = os.path.splitext(path)[1].lower().lstrip(".")
         mime = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png",
                 "gif": "image/gif", "webp": "image/webp"}.get(ext, "image/jpeg")
-        return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+        return f"data:{mime};base64,{b64encode(data).decode()}"
     except Exception:
         return None
 
@@ -830,7 +1151,7 @@ def mostrar_recarga(token: str, request: Request) -> HTMLResponse:
         "audio":      bool(aceptacion.get("audio_path")),
     }
 
-    template = templates_env.get_template("recarga_form.html")
+    template = _TPL_RECARGA_FORM
     html = template.render(
         request=request,
         aceptacion=aceptacion,
@@ -853,119 +1174,151 @@ def procesar_recarga(
     salud_doc: Optional[UploadFile] = File(None),
     salud_doc_tipo: Optional[str] = Form(None),
     audio_base64_new: Optional[str] = Form(None),
+    audio_file_new: Optional[UploadFile] = File(None),
 ) -> HTMLResponse:
-    """Procesa el re-envío de documentos para un deslinde rechazado."""
+    """
+    Procesa el re-envío de documentos para un deslinde rechazado. El audio
+    llega como archivo binario (audio_file_new); audio_base64_new se mantiene
+    como fallback para navegadores sin DataTransfer.
+    """
     import json as _json
     aceptacion = _validar_recarga_token(token)
 
-    updates: dict = {}
+    # Los archivos nuevos se escriben en staging y se publican recién después
+    # del UPDATE: si algo falla no quedan evidencias huérfanas
+    staging_dir = tempfile.mkdtemp(prefix=f"recarga-{aceptacion['id']}-", dir=STAGING_DIR)
 
-    # --- Firma ---
-    if firma_base64_new and firma_base64_new.strip():
-        encoded = firma_base64_new.split(",", 1)[1] if "," in firma_base64_new else firma_base64_new
-        try:
-            data = base64.b64decode(encoded)
-            filename = f"{uuid.uuid4()}.png"
-            filepath = os.path.join(FIRMAS_DIR, filename)
-            with open(filepath, "wb") as f:
-                f.write(data)
-            updates["firma_path"] = filepath
-        except Exception as e:
-            app_logger.error(f"Error guardando firma en recarga token={token[:8]}: {e}")
+    def _en_staging(final_path: str) -> str:
+        return os.path.join(staging_dir, os.path.basename(final_path))
 
-    # --- Frente del documento ---
-    if doc_frente and doc_frente.filename:
-        ext = os.path.splitext(doc_frente.filename)[1] or ".jpg"
-        filename = f"{uuid.uuid4()}_frente{ext}"
-        filepath = os.path.join(DOCUMENTOS_DIR, filename)
-        try:
-            with open(filepath, "wb") as buf:
-                shutil.copyfileobj(doc_frente.file, buf)
-            updates["doc_frente_path"] = filepath
-        except Exception as e:
-            app_logger.error(f"Error guardando doc_frente en recarga: {e}")
+    try:
+        updates: dict = {}
 
-    # --- Dorso del documento ---
-    if doc_dorso and doc_dorso.filename:
-        ext = os.path.splitext(doc_dorso.filename)[1] or ".jpg"
-        filename = f"{uuid.uuid4()}_dorso{ext}"
-        filepath = os.path.join(DOCUMENTOS_DIR, filename)
-        try:
-            with open(filepath, "wb") as buf:
-                shutil.copyfileobj(doc_dorso.file, buf)
-            updates["doc_dorso_path"] = filepath
-        except Exception as e:
-            app_logger.error(f"Error guardando doc_dorso en recarga: {e}")
+        # --- Firma ---
+        if firma_base64_new and firma_base64_new.strip():
+            try:
+                if _tamano_base64(firma_base64_new) > MAX_FIRMA_MB * 1024 * 1024:
+                    raise ValueError(f"firma de más de {MAX_FIRMA_MB} MB")
+                _, data = _decodificar_data_url(firma_base64_new)
+                data = optimizar_firma_png(data)
+                filename = f"{uuid.uuid4()}.png"
+                filepath = os.path.join(FIRMAS_DIR, filename)
+                _escribir_archivo(_en_staging(filepath), data)
+                updates["firma_path"] = filepath
+            except Exception as e:
+                app_logger.error("Error guardando firma en recarga token=%s: %s", token[:8], e)
 
-    # --- Documento de salud ---
-    if salud_doc and salud_doc.filename:
-        ext = os.path.splitext(salud_doc.filename)[1] or ".jpg"
-        filename = f"{uuid.uuid4()}{ext}"
-        filepath = os.path.join(SALUD_DIR, filename)
-        try:
-            with open(filepath, "wb") as buf:
-                shutil.copyfileobj(salud_doc.file, buf)
-            updates["salud_doc_path"] = filepath
-            if salud_doc_tipo:
-                updates["salud_doc_tipo"] = salud_doc_tipo
-        except Exception as e:
-            app_logger.error(f"Error guardando salud_doc en recarga: {e}")
+        # --- Frente del documento ---
+        if doc_frente and doc_frente.filename:
+            ext = os.path.splitext(doc_frente.filename)[1] or ".jpg"
+            filename = f"{uuid.uuid4()}_frente{ext}"
+            filepath = os.path.join(DOCUMENTOS_DIR, filename)
+            try:
+                _guardar_upload(doc_frente, _en_staging(filepath), MAX_IMAGE_DOC_MB * 1024 * 1024)
+                updates["doc_frente_path"] = filepath
+            except HTTPException:
+                raise
+            except Exception as e:
+                app_logger.error("Error guardando doc_frente en recarga: %s", e)
 
-    # --- Audio ---
-    if audio_base64_new and audio_base64_new.strip():
-        header = audio_base64_new.split(",")[0] if "," in audio_base64_new else ""
-        encoded = audio_base64_new.split(",", 1)[1] if "," in audio_base64_new else audio_base64_new
-        try:
-            data = base64.b64decode(encoded)
-            ext = ".webm"
-            if "audio/mp3" in header: ext = ".mp3"
-            elif "audio/wav" in header: ext = ".wav"
-            elif "audio/ogg" in header: ext = ".ogg"
+        # --- Dorso del documento ---
+        if doc_dorso and doc_dorso.filename:
+            ext = os.path.splitext(doc_dorso.filename)[1] or ".jpg"
+            filename = f"{uuid.uuid4()}_dorso{ext}"
+            filepath = os.path.join(DOCUMENTOS_DIR, filename)
+            try:
+                _guardar_upload(doc_dorso, _en_staging(filepath), MAX_IMAGE_DOC_MB * 1024 * 1024)
+                updates["doc_dorso_path"] = filepath
+            except HTTPException:
+                raise
+            except Exception as e:
+                app_logger.error("Error guardando doc_dorso en recarga: %s", e)
+
+        # --- Documento de salud ---
+        if salud_doc and salud_doc.filename:
+            ext = os.path.splitext(salud_doc.filename)[1] or ".jpg"
             filename = f"{uuid.uuid4()}{ext}"
-            filepath = os.path.join(AUDIOS_DIR, filename)
-            with open(filepath, "wb") as f:
-                f.write(data)
-            updates["audio_path"] = filepath
-        except Exception as e:
-            app_logger.error(f"Error guardando audio en recarga: {e}")
+            filepath = os.path.join(SALUD_DIR, filename)
+            try:
+                _guardar_upload(salud_doc, _en_staging(filepath), MAX_IMAGE_DOC_MB * 1024 * 1024)
+                updates["salud_doc_path"] = filepath
+                if salud_doc_tipo:
+                    updates["salud_doc_tipo"] = salud_doc_tipo
+            except HTTPException:
+                raise
+            except Exception as e:
+                app_logger.error("Error guardando salud_doc en recarga: %s", e)
 
-    if not updates:
-        raise HTTPException(status_code=400, detail="No se recibió ningún documento nuevo. Por favor adjunta al menos un archivo.")
+        # --- Audio ---
+        if audio_file_new and audio_file_new.filename:
+            try:
+                ext = _extension_audio(audio_file_new.content_type or "")
+                filename = f"{uuid.uuid4()}{ext}"
+                filepath = os.path.join(AUDIOS_DIR, filename)
+                _guardar_upload(audio_file_new, _en_staging(filepath), MAX_AUDIO_MB * 1024 * 1024)
+                updates["audio_path"] = filepath
+            except HTTPException:
+                raise
+            except Exception as e:
+                app_logger.error("Error guardando audio en recarga: %s", e)
+        elif audio_base64_new and audio_base64_new.strip():
+            try:
+                if _tamano_base64(audio_base64_new) > MAX_AUDIO_MB * 1024 * 1024:
+                    raise ValueError(f"audio de más de {MAX_AUDIO_MB} MB")
+                header, data = _decodificar_data_url(audio_base64_new)
+                ext = _extension_audio(header)
+                filename = f"{uuid.uuid4()}{ext}"
+                filepath = os.path.join(AUDIOS_DIR, filename)
+                _escribir_archivo(_en_staging(filepath), data)
+                updates["audio_path"] = filepath
+            except Exception as e:
+                app_logger.error("Error guardando audio en recarga: %s", e)
 
-    now_utc = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-    updates["estado_revision"] = None
-    updates["recarga_token_usado"] = 1
+        if not updates:
+            raise HTTPException(status_code=400, detail="No se recibió ningún documento nuevo. Por favor adjunta al menos un archivo.")
 
-    conn = _get_connection()
-    try:
-        cur = conn.cursor()
-        set_parts = [f"{col} = %s" for col in updates]
-        values = list(updates.values()) + [aceptacion["id"]]
-        cur.execute(
-            f"UPDATE aceptaciones SET {', '.join(set_parts)} WHERE id = %s",
-            values,
-        )
-        campos_doc = [k for k in updates if k not in ("estado_revision", "recarga_token_usado")]
-        detalle = _json.dumps({"campos": campos_doc}, ensure_ascii=False)
-        cur.execute(
-            """
-            INSERT INTO aceptaciones_historial
-                (aceptacion_id, evento_id, accion, realizado_por, fecha, detalle)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """,
-            (aceptacion["id"], aceptacion["evento_id"], "RECARGA_DOCUMENTOS",
-             "participante", now_utc, detalle),
-        )
-        conn.commit()
-    except Exception as e:
-        app_logger.error(f"Error DB en procesar_recarga token={token[:8]}: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Error interno del servidor")
-    finally:
-        conn.close()
+        now_utc = ahora_utc_iso()
+        updates["estado_revision"] = None
+        updates["recarga_token_usado"] = 1
+
+        conn = _get_connection()
+        try:
+            with _escritura_sqlite(conn):
+                cur = conn.cursor()
+                set_parts = [f"{col} = %s" for col in updates]
+                values = list(updates.values()) + [aceptacion["id"]]
+                cur.execute(
+                    f"UPDATE aceptaciones SET {', '.join(set_parts)} WHERE id = %s",
+                    values,
+                )
+                campos_doc = [k for k in updates if k not in ("estado_revision", "recarga_token_usado")]
+                detalle = _json.dumps({"campos": campos_doc}, ensure_ascii=False)
+                cur.execute(
+                    """
+                    INSERT INTO aceptaciones_historial
+                        (aceptacion_id, evento_id, accion, realizado_por, fecha, detalle)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    """,
+                    (aceptacion["id"], aceptacion["evento_id"], "RECARGA_DOCUMENTOS",
+                     "participante", now_utc, detalle),
+                )
+                conn.commit()
+            _publicar_staging([
+                (_en_staging(updates[campo]), updates[campo])
+                for campo in ("firma_path", "doc_frente_path", "doc_dorso_path", "salud_doc_path", "audio_path")
+                if campo in updates
+            ])
+        except Exception as e:
+            app_logger.error("Error DB en procesar_recarga token=%s: %s", token[:8], e, exc_info=True)
+            raise HTTPException(status_code=500, detail="Error interno del servidor")
+        finally:
+            conn.close()
 
-    app_logger.info(f"Recarga exitosa aceptacion_id={aceptacion['id']} campos={campos_doc}")
+        app_logger.info("Recarga exitosa aceptacion_id=%s campos=%s", aceptacion['id'], campos_doc)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
 
-    template = templates_env.get_template("recarga_form.html")
+    template = _TPL_RECARGA_FORM
     html = template.render(
         request=request,
         aceptacion=aceptacion,
@@ -983,11 +1336,11 @@ def public_descargar_pdf_aceptacion(pdf_token: str):
     """Endpoint público para descargar PDF de aceptación."""
     aceptacion = get_aceptacion_por_token(pdf_token)
     if not aceptacion:
-        app_logger.warning(f"Intento de acceso PDF con token inexistente: {pdf_token[:8]}...")
+        app_logger.warning("Intento de acceso PDF con token inexistente: %s...", pdf_token[:8])
         raise HTTPException(status_code=404, detail="Aceptación no encontrada o token inválido")
 
     if aceptacion.get("pdf_token_revoked"):
-        app_logger.warning(f"Intento de acceso PDF con token REVOCADO: id={aceptacion['id']}")
+        app_logger.warning("Intento de acceso PDF con token REVOCADO: id=%s", aceptacion['id'])
         raise HTTPException(status_code=404, detail="Aceptación no encontrada o token inválido")
 
     if aceptacion.get("pdf_token_expires_at"):
@@ -996,10 +1349,10 @@ def public_descargar_pdf_aceptacion(pdf_token: str):
             expires_at = datetime.fromisoformat(expires_at_str)
 
             if datetime.utcnow() > expires_at:
-                app_logger.warning(f"Intento de acceso PDF con token VENCIDO: id={aceptacion['id']}, expires={aceptacion['pdf_token_expires_at']}")
+                app_logger.warning("Intento de acceso PDF con token VENCIDO: id=%s, expires=%s", aceptacion['id'], aceptacion['pdf_token_expires_at'])
                 raise HTTPException(status_code=404, detail="Aceptación no encontrada o token inválido")
         except Exception:
-            app_logger.error(f"Error validando expiración token id={aceptacion['id']}")
+            app_logger.error("Error validando expiración token id=%s", aceptacion['id'])
             raise HTTPException(status_code=404, detail="Aceptación no encontrada o token inválido")
 
     evento = get_evento(aceptacion["evento_id"])
@@ -1010,7 +1363,7 @@ def public_descargar_pdf_aceptacion(pdf_token: str):
 
     registrar_acceso_pdf(aceptacion["id"])
 
-    app_logger.info(f"PDF público descargado para aceptacion_id={aceptacion['id']} via token")
+    app_logger.info("PDF público descargado para aceptacion_id=%s via token", aceptacion['id'])
 
     filename = "aceptacion.pdf"
     headers = {
@@ -1,13 +1,24 @@
 """
 Configuración centralizada del entorno Jinja2 para EncarreraOK.
-Importar templates_env desde aquí en routers y en main.py.
+Importar templates_env / TEMPLATES desde aquí en routers y en main.py.
 """
 
+import os
+import re
+import gzip
+import hashlib
+from functools import lru_cache
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
+from typing import Optional
 
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
+from app.config import settings
+
+
+@lru_cache(maxsize=1024)
 def fecha_ddmmaaaa(value: str) -> str:
+    """AAAA-MM-DD -> DD/MM/AAAA. Memoizado: hay pocas fechas distintas (una por evento)."""
     try:
         y, m, d = value.split("-")
         return f"{d}/{m}/{y}"
@@ -15,8 +26,123 @@ def fecha_ddmmaaaa(value: str) -> str:
         return value
 
 
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+
+
+@lru_cache(maxsize=None)
+def asset_url(path: str) -> str:
+    """
+    URL de un archivo de /assets con hash de contenido (?v=...), calculado una
+    vez por proceso. Permite cachear los assets en el navegador sin servir
+    versiones viejas después de un deploy.
+    """
+    try:
+        version = hashlib.md5((ASSETS_DIR / path).read_bytes()).hexdigest()[:8]
+    except OSError:
+        return f"/assets/{path}"
+    return f"/assets/{path}?v={version}"
+
+
+def precomprimir_assets(extensiones: tuple = (".css", ".js")) -> None:
+    """
+    Genera una vez (al importar) el .gz de cada asset de texto, para que Nginx
+    lo sirva con gzip_static sin comprimir en cada request. Solo se regenera
+    si el .gz falta o es más viejo que el original; si el directorio no es
+    escribible se omite (Nginx comprime al vuelo como antes).
+    """
+    for path in ASSETS_DIR.rglob("*"):
+        if path.suffix not in extensiones or not path.is_file():
+            continue
+        destino = path.with_name(path.name + ".gz")
+        try:
+            if destino.exists() and destino.stat().st_mtime >= path.stat().st_mtime:
+                continue
+            destino.write_bytes(gzip.compress(path.read_bytes(), 9, mtime=0))
+        except OSError:
+            continue
+
+
+precomprimir_assets()
+
+
+_RE_COMENTARIO_HTML = re.compile(r"<!--.*?-->")
+_RE_INDENTACION = re.compile(r"^[ \t]+", re.MULTILINE)
+_RE_LINEAS_VACIAS = re.compile(r"\n{2,}")
+_RE_BLOQUE_STYLE = re.compile(r"(<style[^>]*>)(.*?)(</style>)", re.DOTALL)
+_RE_COMENTARIO_CSS = re.compile(r"/\*.*?\*/", re.DOTALL)
+_RE_ESPACIOS = re.compile(r"\s+")
+_RE_ESPACIO_SEPARADOR_CSS = re.compile(r"\s*([{};,])\s*")
+
+
+def minificar_css(css: str) -> str:
+    """
+    Minificado de un bloque <style> inline: sin comentarios, en una línea y
+    sin espacios alrededor de { } ; , ni después de ':'. Supone que no hay
+    strings ni selectores con esos caracteres (en los templates no hay).
+    Corre antes que Jinja: se evita generar "{#" / "{%" (ej. @media{#id...}).
+    """
+    css = _RE_COMENTARIO_CSS.sub("", css)
+    css = _RE_ESPACIOS.sub(" ", css)
+    css = _RE_ESPACIO_SEPARADOR_CSS.sub(r"\1", css)
+    css = css.replace(": ", ":").replace(";}", "}")
+    return css.replace("{#", "{ #").replace("{%", "{ %").strip()
+
+
+def minificar_html(source: str) -> str:
+    """
+    Minificado conservador del fuente de un template: quita comentarios HTML
+    de una línea, la indentación y las líneas vacías, y deja cada bloque
+    <style> en una sola línea. Mantiene los saltos de línea del resto (el JS
+    inline depende de ellos) y no toca comentarios // de JS.
+    """
+    source = _RE_COMENTARIO_HTML.sub("", source)
+    source = _RE_BLOQUE_STYLE.sub(lambda m: m.group(1) + minificar_css(m.group(2)) + m.group(3), source)
+    source = _RE_INDENTACION.sub("", source)
+    return _RE_LINEAS_VACIAS.sub("\n", source)
+
+
+class MinifyingFileSystemLoader(FileSystemLoader):
+    """FileSystemLoader que minifica el fuente una vez, antes de compilar."""
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        return minificar_html(source), filename, uptodate
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """
+    Cache de bytecode en disco: los workers de uvicorn cargan el código ya
+    compilado en lugar de re-parsear los templates al arrancar.
+    Usa ENCARRERAOK_JINJA_CACHE_DIR o, si no es escribible, el directorio
+    temporal por usuario de Jinja (_jinja2-cache-<uid>, con chequeo de dueño y
+    permisos). Si ninguno sirve, se trabaja sin cache (solo memoria).
+    """
+    try:
+        os.makedirs(settings.jinja_cache_dir, exist_ok=True)
+        if os.access(settings.jinja_cache_dir, os.W_OK):
+            return FileSystemBytecodeCache(settings.jinja_cache_dir)
+    except OSError:
+        pass
+    try:
+        return FileSystemBytecodeCache()
+    except RuntimeError:
+        return None
+
+
+# Los templates no cambian en caliente en producción: sin auto_reload Jinja no
+# hace stat() del archivo en cada get_template(). Para ver cambios, reiniciar.
 templates_env = Environment(
-    loader=FileSystemLoader(Path(__file__).parent / "templates"),
-    autoescape=True
+    loader=MinifyingFileSystemLoader(Path(__file__).parent / "templates"),
+    autoescape=True,
+    # Quitar la indentación/saltos de línea que dejan los tags {% %}
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,
+    cache_size=-1,
+    bytecode_cache=_bytecode_cache(),
 )
 templates_env.filters["fecha_ddmmaaaa"] = fecha_ddmmaaaa
+templates_env.globals["asset_url"] = asset_url
+
+# Templates compilados una sola vez al importar el módulo (lookup O(1) por request)
+TEMPLATES = {name: templates_env.get_template(name) for name in templates_env.list_templates()}
@@ -0,0 +1,94 @@
+"""
+Utilidades compartidas por los routers de EncarreraOK (public, admin y operator):
+directorio de evidencias, fechas UTC y descarga/verificación de evidencias.
+"""
+
+import os
+import tempfile
+import time
+import logging
+from typing import Optional
+from urllib.parse import quote
+
+from fastapi.responses import FileResponse, Response
+
+from app.config import settings
+
+app_logger = logging.getLogger('encarreraok')
+
+# Directorio de almacenamiento de evidencias
+# Intenta usar el directorio junto a DB_PATH; si no es escribible, usa el
+# directorio del proyecto (worktree) como fallback para desarrollo local.
+DB_PATH = settings.db_path
+_evidencias_candidate = os.path.join(os.path.dirname(DB_PATH), "evidencias")
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_evidencias_fallback = os.path.join(_project_root, "evidencias")
+
+def _resolve_evidencias_dir() -> str:
+    """Devuelve el primer directorio de evidencias que se puede crear/escribir."""
+    for candidate in [_evidencias_candidate, _evidencias_fallback]:
+        try:
+            os.makedirs(candidate, exist_ok=True)
+            test = os.path.join(candidate, ".write_test")
+            with open(test, "w") as f:
+                f.write("ok")
+            os.remove(test)
+            return candidate
+        except Exception:
+            continue
+    # Último recurso: directorio temporal del sistema
+    td = os.path.join(tempfile.gettempdir(), "encarreraok_evidencias")
+    os.makedirs(td, exist_ok=True)
+    return td
+
+EVIDENCIAS_DIR = _resolve_evidencias_dir()
+
+app_logger.info("Evidencias dir: %s", EVIDENCIAS_DIR)
+
+
+def respuesta_evidencia(file_path: str, media_type: Optional[str] = None) -> Response:
+    """
+    Respuesta para descargar una evidencia. Con ENCARRERAOK_EVIDENCIAS_ACCEL_PREFIX
+    configurado delega el envío a Nginx (X-Accel-Redirect, sendfile sin pasar
+    por Python); si no, o si el archivo está fuera de EVIDENCIAS_DIR, FileResponse.
+    """
+    prefix = settings.evidencias_accel_prefix
+    if prefix:
+        rel_path = os.path.relpath(file_path, EVIDENCIAS_DIR)
+        if not rel_path.startswith(os.pardir):
+            return Response(
+                media_type=media_type,
+                headers={"X-Accel-Redirect": prefix.rstrip("/") + "/" + quote(rel_path.replace(os.sep, "/"))},
+            )
+    return FileResponse(file_path, media_type=media_type)
+
+
+def ahora_utc_iso(segundos: float = 0) -> str:
+    """
+    Fecha/hora UTC actual (+ `segundos`) en ISO 8601 sin microsegundos y con
+    sufijo 'Z', el formato de todas las fechas guardadas en la base.
+    """
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + segundos))
+
+
+# Columnas de evidencia de una aceptación (cada una con su flag <campo>_exists)
+CAMPOS_EVIDENCIA = ("firma", "doc_frente", "doc_dorso", "audio", "salud_doc")
+
+
+def marcar_evidencias_existentes(data: dict) -> dict:
+    """
+    Agrega a `data` los flags <campo>_exists de cada evidencia. Un stat por
+    path presente (EAFP); los directorios de evidencias no se listan porque
+    crecen con cada aceptación.
+    """
+    for campo in CAMPOS_EVIDENCIA:
+        path = data.get(f"{campo}_path")
+        existe = False
+        if path:
+            try:
+                os.stat(path)
+                existe = True
+            except OSError:
+                pass
+        data[f"{campo}_exists"] = existe
+    return data
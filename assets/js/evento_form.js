@@ -0,0 +1,544 @@
+// Formulario de aceptación (evento_form.html). Los datos del evento y los
+// límites del backend llegan en window.ENCARRERAOK, definido por el template.
+const CONFIG = window.ENCARRERAOK;
+const MAX_IMAGE_BYTES = CONFIG.maxImageDocMb * 1024 * 1024;
+const MAX_AUDIO_BYTES = CONFIG.maxAudioMb * 1024 * 1024;
+const MAX_FIRMA_BYTES = CONFIG.maxFirmaMb * 1024 * 1024;
+
+// Actualizar nombre en guión de audio
+const nameInput = document.getElementById('nombre_participante');
+const nameScript = document.getElementById('nombre-script');
+if(nameInput && nameScript) {
+    nameInput.addEventListener('input', function() {
+        nameScript.textContent = this.value || "[Su Nombre]";
+    });
+}
+
+// Compresión de Imágenes (Frontend)
+function compressImage(input, maxBytes, typeName) {
+    if (!input.files || !input.files[0]) return;
+
+    const file = input.files[0];
+    const feedbackId = input.id + '_feedback';
+    const feedback = document.getElementById(feedbackId);
+
+    // Si es pequeño o no es imagen soportada, solo validamos tamaño por si acaso
+    if (!file.type.match(/image.*/) || file.type === 'image/gif') {
+        if(file.size > maxBytes) {
+            feedback.textContent = `⚠️ Archivo muy pesado. Máximo: ${typeName}`;
+            feedback.className = 'feedback error';
+            feedback.style.display = 'block';
+            input.value = "";
+        } else {
+            feedback.style.display = 'none';
+        }
+        return;
+    }
+
+    // Si ya es pequeño (< 1.5MB), no comprimir innecesariamente
+    if (file.size < 1.5 * 1024 * 1024) {
+         feedback.style.display = 'none';
+         return;
+    }
+
+    // Object URL en lugar de FileReader: evita pasar la foto (varios MB) a
+    // base64 en memoria solo para decodificarla como imagen.
+    const url = URL.createObjectURL(file);
+    const img = new Image();
+    img.onload = function() {
+        URL.revokeObjectURL(url);
+        let width = img.width;
+        let height = img.height;
+        const maxDim = 1600;
+
+        // Redimensionar si es necesario
+        if (width > maxDim || height > maxDim) {
+            if (width > height) {
+                height = Math.round(height * (maxDim / width));
+                width = maxDim;
+            } else {
+                width = Math.round(width * (maxDim / height));
+                height = maxDim;
+            }
+        }
+
+        const canvas = document.createElement('canvas');
+        canvas.width = width;
+        canvas.height = height;
+        const ctx = canvas.getContext('2d');
+        ctx.drawImage(img, 0, 0, width, height);
+
+        canvas.toBlob(function(blob) {
+            // Si no se pudo codificar o no achicó, se envía el original
+            if (!blob || blob.size >= file.size) return;
+
+            // Reemplazar archivo silenciosamente
+            const newFile = new File([blob], file.name, {
+                type: 'image/jpeg',
+                lastModified: Date.now()
+            });
+
+            try {
+                const dt = new DataTransfer();
+                dt.items.add(newFile);
+                input.files = dt.files;
+            } catch (err) {
+                // Navegadores sin DataTransfer: queda el original (el backend comprime)
+                return;
+            }
+
+            // Limpiar feedback visual
+            feedback.style.display = 'none';
+
+            // console.log(`Comprimido: ${(file.size/1024/1024).toFixed(2)}MB -> ${(newFile.size/1024/1024).toFixed(2)}MB`);
+
+        }, 'image/jpeg', 0.75);
+    };
+    img.onerror = function() {
+        URL.revokeObjectURL(url);
+        // Si falla carga de imagen, dejamos pasar el original (validación backend atrapará si es muy grande)
+        console.warn("No se pudo cargar imagen para comprimir");
+    };
+    img.src = url;
+}
+
+// Bind File Inputs
+['doc_frente', 'doc_dorso', 'salud_doc'].forEach(id => {
+    const input = document.getElementById(id);
+    if(input) {
+        input.addEventListener('change', function() {
+            compressImage(this, MAX_IMAGE_BYTES, CONFIG.maxImageDocMb + ' MB');
+        });
+    }
+});
+
+// Lógica de Audio (si existe)
+if (CONFIG.reqAudio) (function() {
+    let mediaRecorder;
+    // Última grabación: el object URL del preview se crea recién al escucharla
+    let grabacion = null;
+    let audioUrl = null;
+    let audioChunks = [];
+    const btnRecord = document.getElementById('btn-record');
+    const btnStop = document.getElementById('btn-stop');
+    const btnPlay = document.getElementById('btn-play');
+    const btnReset = document.getElementById('btn-reset');
+    const status = document.getElementById('audio-status');
+    const audioPreview = document.getElementById('audio-preview');
+    const hiddenInput = document.getElementById('audio_base64');
+    const fileInput = document.getElementById('audio_file');
+    const feedback = document.getElementById('audio-feedback');
+    // Opus a baja tasa: para voz rinde 5-10x menos que el default del navegador
+    const AUDIO_MIME = (window.MediaRecorder && MediaRecorder.isTypeSupported)
+        ? ['audio/webm;codecs=opus', 'audio/ogg;codecs=opus', 'audio/mp4'].find(t => MediaRecorder.isTypeSupported(t))
+        : undefined;
+    // Sin MediaRecorder/getUserMedia no hay forma de grabar: avisar de entrada
+    // en lugar de fallar recién al pedir el micrófono
+    if (!window.MediaRecorder || !(navigator.mediaDevices && navigator.mediaDevices.getUserMedia)) {
+        btnRecord.disabled = true;
+        status.textContent = "⚠️ Este navegador no permite grabar audio";
+    }
+
+    window.toggleAudioRequirement = function() {
+        const isExento = document.getElementById('audio_exento').checked;
+        const container = document.getElementById('audio_container_inner');
+        if(isExento) {
+            container.style.opacity = '0.5';
+            container.style.pointerEvents = 'none';
+            hiddenInput.value = "";
+            fileInput.value = "";
+            feedback.style.display = 'none';
+        } else {
+            container.style.opacity = '1';
+            container.style.pointerEvents = 'auto';
+        }
+    };
+
+    async function startRecording() {
+        try {
+            const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+            const opciones = { audioBitsPerSecond: 24000, audioBitrateMode: 'constant' };
+            if (AUDIO_MIME) opciones.mimeType = AUDIO_MIME;
+            mediaRecorder = new MediaRecorder(stream, opciones);
+            audioChunks = [];
+            let acumulado = 0;
+            let cortado = false;
+
+            // Fragmentos de 1 s: se corta solo al acercarse al máximo
+            // permitido, así la memoria queda acotada a MAX_AUDIO_BYTES.
+            mediaRecorder.ondataavailable = e => {
+                audioChunks.push(e.data);
+                acumulado += e.data.size;
+                if (acumulado > MAX_AUDIO_BYTES * 0.95 && mediaRecorder.state === 'recording') {
+                    cortado = true;
+                    mediaRecorder.stop();
+                    btnStop.disabled = true;
+                }
+            };
+            mediaRecorder.onstop = () => {
+                // Liberar el micrófono
+                stream.getTracks().forEach(t => t.stop());
+                const audioBlob = new Blob(audioChunks, { type: mediaRecorder.mimeType || AUDIO_MIME || 'audio/webm' });
+                if(audioBlob.size > MAX_AUDIO_BYTES) {
+                    feedback.textContent = "⚠️ Audio muy largo. Intente de nuevo.";
+                    feedback.className = 'feedback error';
+                    feedback.style.display = 'block';
+                    return;
+                }
+
+                descartarPreview();
+                grabacion = audioBlob;
+
+                // Se envía como archivo binario (sin base64); FileReader solo como fallback
+                const ext = audioBlob.type.indexOf('ogg') >= 0 ? '.ogg'
+                          : audioBlob.type.indexOf('mp4') >= 0 ? '.mp4' : '.webm';
+                try {
+                    const dt = new DataTransfer();
+                    dt.items.add(new File([audioBlob], 'audio' + ext, { type: audioBlob.type }));
+                    fileInput.files = dt.files;
+                    hiddenInput.value = "";
+                } catch (err) {
+                    const reader = new FileReader();
+                    reader.readAsDataURL(audioBlob);
+                    reader.onloadend = () => hiddenInput.value = reader.result;
+                }
+
+                btnPlay.disabled = false;
+                btnReset.disabled = false;
+                if (cortado) {
+                    // Se detuvo solo al llegar al tamaño máximo: la frase puede haber quedado incompleta
+                    status.textContent = "⚠️ Grabación cortada por tamaño máximo. Escúchela y, si quedó incompleta, grabe de nuevo.";
+                    status.style.color = "#fd7e14";
+                } else {
+                    status.textContent = "✅ Grabación completada";
+                }
+            };
+
+            mediaRecorder.start(1000);
+            btnRecord.disabled = true;
+            btnStop.disabled = false;
+            btnPlay.disabled = true;
+            btnReset.disabled = true;
+            status.textContent = "🔴 Grabando...";
+            status.style.color = "#dc3545";
+        } catch (err) {
+            alert("No se pudo acceder al micrófono. Verifique los permisos.");
+            console.error(err);
+        }
+    }
+
+    btnRecord.addEventListener('click', startRecording);
+    btnStop.addEventListener('click', () => {
+        if(mediaRecorder && mediaRecorder.state !== 'inactive') mediaRecorder.stop();
+        btnStop.disabled = true;
+    });
+    // Asignar src dispara la carga (demux) del audio: se hace solo si el
+    // participante quiere escucharlo, no en cada grabación
+    function descartarPreview() {
+        if (audioUrl) {
+            URL.revokeObjectURL(audioUrl);
+            audioUrl = null;
+            audioPreview.removeAttribute('src');
+        }
+    }
+    btnPlay.addEventListener('click', () => {
+        if (!audioUrl && grabacion) {
+            audioUrl = URL.createObjectURL(grabacion);
+            audioPreview.src = audioUrl;
+        }
+        audioPreview.play();
+    });
+    btnReset.addEventListener('click', () => {
+        descartarPreview();
+        grabacion = null;
+        hiddenInput.value = "";
+        fileInput.value = "";
+        btnRecord.disabled = false;
+        btnPlay.disabled = true;
+        btnReset.disabled = true;
+        status.textContent = "Listo para grabar";
+        status.style.color = "#666";
+    });
+})();
+
+// Lógica de Firma (canvas nativo)
+if (CONFIG.reqFirma) (function() {
+    var modal      = document.getElementById('signature-modal');
+    var sigArea    = document.getElementById('signature-area');
+    var hiddenInput = document.getElementById('firma_base64');
+    var fileInput  = document.getElementById('firma_file');
+    var strokes    = [];   // trazos desde el último "Limpiar" ({x, y} en px del canvas)
+    var savedStrokes = null; // trazos de la firma guardada
+    var previewMsg = document.getElementById('signature-preview-msg');
+    var canvas, ctx;
+    var isDrawing  = false;
+    var hasStrokes = false;
+    var lastX = 0, lastY = 0;
+
+    var lastW = 0, lastH = 0;
+
+    function aplicarEstilo(c) {
+        c.strokeStyle = '#000';
+        c.lineWidth   = 2.5;
+        c.lineCap     = 'round';
+        c.lineJoin    = 'round';
+    }
+
+    function copiarTrazos(lista) {
+        return lista.map(function(t) {
+            return t.map(function(p) { return { x: p.x, y: p.y }; });
+        });
+    }
+
+    function trazar(c, lista) {
+        for (var i = 0; i < lista.length; i++) {
+            var t = lista[i];
+            if (t.length < 2) continue;
+            c.beginPath();
+            c.moveTo(t[0].x, t[0].y);
+            for (var j = 1; j < t.length; j++) c.lineTo(t[j].x, t[j].y);
+            c.stroke();
+        }
+    }
+
+    // Ramer-Douglas-Peucker: descarta puntos casi colineales (a menos
+    // de epsilon px de la recta) antes de exportar el PNG.
+    function simplificar(puntos, epsilon) {
+        if (puntos.length < 3) return puntos;
+        var a = puntos[0], b = puntos[puntos.length - 1];
+        var dx = b.x - a.x, dy = b.y - a.y;
+        var largo = Math.sqrt(dx * dx + dy * dy);
+        var maxDist = 0, idx = 0;
+        for (var i = 1; i < puntos.length - 1; i++) {
+            var p = puntos[i];
+            var d = largo
+                ? Math.abs(dy * p.x - dx * p.y + b.x * a.y - b.y * a.x) / largo
+                : Math.sqrt((p.x - a.x) * (p.x - a.x) + (p.y - a.y) * (p.y - a.y));
+            if (d > maxDist) { maxDist = d; idx = i; }
+        }
+        if (maxDist <= epsilon) return [a, b];
+        var izq = simplificar(puntos.slice(0, idx + 1), epsilon);
+        return izq.slice(0, -1).concat(simplificar(puntos.slice(idx), epsilon));
+    }
+
+    // Canvas fuera de pantalla con los trazos simplificados, solo para el PNG
+    function canvasExportacion() {
+        var off = document.createElement('canvas');
+        off.width  = canvas.width;
+        off.height = canvas.height;
+        var c = off.getContext('2d');
+        aplicarEstilo(c);
+        trazar(c, strokes.map(function(t) { return simplificar(t, 0.5); }));
+        return off;
+    }
+
+    // Crea el canvas y el contexto una sola vez; se reutilizan entre aperturas
+    function initCanvas() {
+        if (canvas) return;
+        canvas = document.createElement('canvas');
+        canvas.style.display = 'block';
+        canvas.style.width   = '100%';
+        canvas.style.height  = '100%';
+        canvas.style.touchAction = 'none';
+        sigArea.appendChild(canvas);
+        ctx = canvas.getContext('2d');
+        bindCanvas();
+    }
+
+    // Ajusta el backing store al contenedor solo si cambió de tamaño,
+    // conservando lo dibujado (redimensionar un canvas lo borra).
+    function resizeCanvas() {
+        var w = sigArea.offsetWidth  || 500;
+        var h = sigArea.offsetHeight || 220;
+        if (w === lastW && h === lastH) return;
+        if (lastW && lastH) {
+            var sx = w / lastW, sy = h / lastH;
+            var escalar = function(t) {
+                t.forEach(function(p) { p.x *= sx; p.y *= sy; });
+            };
+            strokes.forEach(escalar);
+            // La firma guardada se restaura al reabrir: mismas coordenadas
+            if (savedStrokes) savedStrokes.forEach(escalar);
+        }
+        var copia = null;
+        if (hasStrokes) {
+            copia = document.createElement('canvas');
+            copia.width = canvas.width;
+            copia.height = canvas.height;
+            copia.getContext('2d').drawImage(canvas, 0, 0);
+        }
+        canvas.width  = w;
+        canvas.height = h;
+        lastW = w; lastH = h;
+        aplicarEstilo(ctx);
+        if (copia) ctx.drawImage(copia, 0, 0, w, h);
+    }
+
+    // Resize del contenedor (teclado móvil, rotación) limitado a uno por frame
+    var resizePending = false;
+    function onResize() {
+        if (resizePending || !canvas || modal.style.display !== 'flex') return;
+        resizePending = true;
+        requestAnimationFrame(function() {
+            resizePending = false;
+            resizeCanvas();
+        });
+    }
+    if (window.ResizeObserver) {
+        new ResizeObserver(onResize).observe(sigArea);
+    } else {
+        window.addEventListener('resize', onResize);
+    }
+
+    // Puntos pendientes: se dibujan en lote una vez por frame (rAF)
+    var pending = [];
+    var frameId = 0;
+    var rect = null;
+
+    function getPos(e) {
+        return {
+            x: (e.clientX - rect.left) * (canvas.width  / rect.width),
+            y: (e.clientY - rect.top)  * (canvas.height / rect.height)
+        };
+    }
+
+    function flush() {
+        frameId = 0;
+        if (!pending.length) return;
+        for (var i = 0; i < pending.length; i++) {
+            ctx.lineTo(pending[i].x, pending[i].y);
+        }
+        ctx.stroke();
+        // Reiniciar el path en el último punto para no re-trazar todo el trazo
+        var last = pending[pending.length - 1];
+        ctx.beginPath();
+        ctx.moveTo(last.x, last.y);
+        pending.length = 0;
+        hasStrokes = true;
+    }
+
+    function onStart(e) {
+        isDrawing = true;
+        rect = canvas.getBoundingClientRect();
+        if (canvas.setPointerCapture) canvas.setPointerCapture(e.pointerId);
+        var pos = getPos(e);
+        lastX = pos.x; lastY = pos.y;
+        strokes.push([pos]);
+        ctx.beginPath();
+        ctx.moveTo(lastX, lastY);
+        e.preventDefault();
+    }
+
+    function onMove(e) {
+        if (!isDrawing) return;
+        var events = e.getCoalescedEvents ? e.getCoalescedEvents() : [];
+        if (!events.length) events = [e];
+        var trazo = strokes[strokes.length - 1];
+        for (var i = 0; i < events.length; i++) {
+            var pos = getPos(events[i]);
+            pending.push(pos);
+            trazo.push(pos);
+        }
+        if (!frameId) frameId = requestAnimationFrame(flush);
+        e.preventDefault();
+    }
+
+    function onEnd(e) {
+        if (!isDrawing) return;
+        if (frameId) cancelAnimationFrame(frameId);
+        flush();
+        isDrawing = false;
+    }
+
+    function bindCanvas() {
+        canvas.addEventListener('pointerdown',   onStart);
+        canvas.addEventListener('pointermove',   onMove);
+        canvas.addEventListener('pointerup',     onEnd);
+        canvas.addEventListener('pointercancel', onEnd);
+    }
+
+    // Abrir modal
+    document.getElementById('open-signature-modal').addEventListener('click', function() {
+        modal.style.display = 'flex';
+        // Esperar a que el modal sea visible antes de leer dimensiones
+        setTimeout(function() {
+            initCanvas();
+            // Descartar trazos no guardados y mostrar la firma guardada, si la hay
+            strokes = savedStrokes ? copiarTrazos(savedStrokes) : [];
+            hasStrokes = false;
+            resizeCanvas();
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+            trazar(ctx, strokes);
+            hasStrokes = strokes.some(function(t) { return t.length > 1; });
+        }, 60);
+    });
+
+    // Limpiar
+    document.getElementById('sig-clear').addEventListener('click', function() {
+        if (ctx) {
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+            strokes = [];
+            hasStrokes = false;
+        }
+    });
+
+    // Cancelar
+    document.getElementById('sig-cancel').addEventListener('click', function() {
+        modal.style.display = 'none';
+    });
+
+    // Guardar firma
+    document.getElementById('sig-save').addEventListener('click', function() {
+        if (!hasStrokes) {
+            alert("Por favor firme antes de guardar.");
+            return;
+        }
+        // PNG binario vía toBlob (codifica fuera del hilo principal
+        // y evita el +33% de base64); se envía como archivo.
+        var exportacion = canvasExportacion();
+        exportacion.toBlob(function(blob) {
+            if (!blob) return;
+            if (blob.size > MAX_FIRMA_BYTES) {
+                alert("La firma es demasiado grande. Por favor, firme más pequeña.");
+                return;
+            }
+            try {
+                var dt = new DataTransfer();
+                dt.items.add(new File([blob], 'firma.png', { type: 'image/png' }));
+                fileInput.files = dt.files;
+                hiddenInput.value = '';
+            } catch (err) {
+                // Navegadores sin DataTransfer: fallback a base64
+                hiddenInput.value = exportacion.toDataURL('image/png');
+            }
+            savedStrokes = copiarTrazos(strokes);
+            previewMsg.style.display = 'block';
+            modal.style.display = 'none';
+        }, 'image/png');
+    });
+
+    // Validar al enviar
+    document.getElementById('acceptForm').addEventListener('submit', function(e) {
+        if (document.getElementById('firma_asistida').checked) return;
+        if (!savedStrokes) {
+            alert("Por favor firme el documento.");
+            e.preventDefault();
+        }
+    });
+})();
+
+// Validación Final en Submit
+document.getElementById('acceptForm').addEventListener('submit', function(e) {
+    // Validar audio si es requerido y no exento
+    if (CONFIG.reqAudio) {
+        const audioInput = document.getElementById('audio_base64');
+        const audioFile = document.getElementById('audio_file');
+        const audioExento = document.getElementById('audio_exento');
+        const tieneAudio = audioInput.value || (audioFile.files && audioFile.files.length);
+        if (!tieneAudio && (!audioExento || !audioExento.checked)) {
+            alert("Debe grabar el audio de aceptación.");
+            e.preventDefault();
+            return;
+        }
+    }
+});
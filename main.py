@@ -17,55 +17,130 @@
 # - Ruta de la base: configurable con ENV `ENCARRERAOK_DB_PATH`.
 
 import os
-import re
 import stat
+import time
+import queue
+import atexit
 import sqlite3
 import logging
 from datetime import date
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from app.config import settings
 from app.db.database import get_connection, is_postgres_configured
+from app.pdf_generator import precargar_deslindes
 from app.routers import public, admin, operator
+from app.routers.public import normalizar_documento_helper
+from app.middleware.body_limit import BodyLimitMiddleware
 
 
 # ------------------------------------------------------------------------------
 # Configuración de logging
 # ------------------------------------------------------------------------------
 
-def setup_logging() -> None:
-    """Configura logging a archivo con rotación."""
+class RotatingFileHandlerContado(RotatingFileHandler):
+    """
+    RotatingFileHandler que lleva el tamaño del archivo en memoria.
+
+    El handler estándar, en cada registro, hace dos stat() del archivo, un
+    seek/tell y formatea el mensaje dos veces (una para medir y otra para
+    escribir). Acá el tamaño se lee una sola vez con fstat al abrir y luego se
+    suma lo escrito, en bytes codificados (maxBytes es en bytes y los mensajes
+    en castellano tienen tildes/ñ). Asume un único proceso escribiendo el log
+    (--workers 1).
+    """
+
+    def _open(self):
+        stream = super()._open()
+        self._tamano = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg = self.format(record) + self.terminator
+            # Líneas ASCII (la mayoría): largo en caracteres == largo en bytes
+            tamano = len(msg) if msg.isascii() else len(msg.encode(self.encoding or "utf-8"))
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._tamano + tamano >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(msg)
+            self.flush()
+            self._tamano += tamano
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class FormatterLinea(logging.Formatter):
+    """
+    Formatter de una línea "fecha [NIVEL] mensaje" armado con un f-string.
+
+    Produce lo mismo que '%(asctime)s [%(levelname)s] %(message)s' con
+    datefmt '%Y-%m-%d %H:%M:%S', pero sin pasar por el estilo % ni recalcular
+    la fecha para registros del mismo segundo. Solo lo usa el thread del
+    QueueListener, así que la memoización no necesita lock.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._segundo = -1
+        self._asctime = ""
+
+    def format(self, record: logging.LogRecord) -> str:
+        segundo = int(record.created)
+        if segundo != self._segundo:
+            self._segundo = segundo
+            self._asctime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(segundo))
+        linea = f"{self._asctime} [{record.levelname}] {record.getMessage()}"
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            linea = f"{linea}\n{record.exc_text}"
+        if record.stack_info:
+            linea = f"{linea}\n{self.formatStack(record.stack_info)}"
+        return linea
+
+
+def setup_logging() -> logging.Logger:
+    """
+    Configura logging a archivo con rotación.
+    Los requests solo encolan el LogRecord (QueueHandler); la escritura a disco
+    y la rotación las hace un QueueListener en su propio thread.
+    """
     target_dir = "/var/log/encarreraok"
 
     try:
         os.makedirs(target_dir, exist_ok=True)
-        test_file = os.path.join(target_dir, ".test_write")
-        with open(test_file, 'w') as f:
-            f.write('ok')
-        os.remove(test_file)
-    except Exception:
+    except OSError:
+        pass
+    # Un solo access() en lugar de crear y borrar un archivo de prueba
+    if not (os.path.isdir(target_dir) and os.access(target_dir, os.W_OK)):
         target_dir = os.path.dirname(os.path.abspath(__file__))
 
     final_log_file = os.path.join(target_dir, "app.log")
 
-    handler = RotatingFileHandler(
+    handler = RotatingFileHandlerContado(
         final_log_file,
         maxBytes=10 * 1024 * 1024,
         backupCount=5,
         encoding='utf-8'
     )
-    formatter = logging.Formatter(
-        '%(asctime)s [%(levelname)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
+    handler.setFormatter(FormatterLinea())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
 
     logger = logging.getLogger('encarreraok')
     logger.setLevel(logging.INFO)
-    logger.addHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
     return logger
 
 app_logger = setup_logging()
@@ -87,10 +162,21 @@ AUDIOS_DIR = os.path.join(EVIDENCIAS_DIR, "audios")
 SALUD_DIR = os.path.join(EVIDENCIAS_DIR, "salud")
 
 
+# Marca de subdirectorios de evidencias ya creados: evita repetir sus makedirs
+# en cada arranque (y en cada worker). Vive dentro de EVIDENCIAS_DIR, así que
+# si se recrea ese directorio la marca desaparece con él.
+_EVIDENCIAS_READY = False
+_EVIDENCIAS_SENTINEL = os.path.join(EVIDENCIAS_DIR, ".storage_ready")
+
+
 def ensure_storage() -> None:
     """
     Garantiza que directorios de DB y evidencias existan con permisos.
+    El directorio y los permisos de la DB se revisan en cada arranque (una DB
+    restaurada con cp queda 0644); solo los subdirectorios de evidencias se
+    omiten si ya existe la marca.
     """
+    global _EVIDENCIAS_READY
     db_dir = os.path.dirname(DB_PATH)
     try:
         os.makedirs(db_dir, exist_ok=True)
@@ -105,21 +191,21 @@ def ensure_storage() -> None:
             except Exception:
                 pass
 
+        if _EVIDENCIAS_READY or os.path.exists(_EVIDENCIAS_SENTINEL):
+            _EVIDENCIAS_READY = True
+            return
+
         os.makedirs(FIRMAS_DIR, exist_ok=True)
         os.makedirs(DOCUMENTOS_DIR, exist_ok=True)
         os.makedirs(AUDIOS_DIR, exist_ok=True)
         os.makedirs(SALUD_DIR, exist_ok=True)
+
+        open(_EVIDENCIAS_SENTINEL, "w").close()
+        _EVIDENCIAS_READY = True
     except Exception:
         pass
 
 
-def normalizar_documento_helper(doc: str) -> str:
-    """Normaliza documento: quita puntos, guiones, espacios y pasa a mayúsculas."""
-    if not doc:
-        return ""
-    return re.sub(r"[.\-\s]", "", doc).upper()
-
-
 # get_connection() importado desde app.db.database (soporta SQLite y PostgreSQL)
 
 
@@ -179,10 +265,85 @@ def ensure_schema_migrations(conn: sqlite3.Connection) -> None:
         ]:
             if col not in columns:
                 cur.execute(f"ALTER TABLE aceptaciones ADD COLUMN {col} {definition}")
-                app_logger.info(f"Migración aplicada: columna {col} agregada a aceptaciones")
+                app_logger.info("Migración aplicada: columna %s agregada a aceptaciones", col)
 
     except sqlite3.OperationalError as e:
-        app_logger.error(f"Error en migración de esquema: {e}")
+        app_logger.error("Error en migración de esquema: %s", e)
+
+# Versión del esquema SQLite (PRAGMA user_version). Al agregar DDL a
+# _SQLITE_MIGRACIONES, crear una nueva versión y subir SQLITE_SCHEMA_VERSION.
+SQLITE_SCHEMA_VERSION = 1
+
+# Versión -> ALTERs a aplicar. Cada ALTER es idempotente (si la columna ya
+# existe, el OperationalError se ignora), así que una base creada antes del
+# versionado (user_version = 0) se pone al día sin riesgo.
+_SQLITE_MIGRACIONES = {
+    1: [
+        # eventos
+        "ALTER TABLE eventos ADD COLUMN req_firma INTEGER DEFAULT 0 CHECK (req_firma IN (0,1))",
+        "ALTER TABLE eventos ADD COLUMN req_documento INTEGER DEFAULT 0 CHECK (req_documento IN (0,1))",
+        "ALTER TABLE eventos ADD COLUMN req_audio INTEGER DEFAULT 0 CHECK (req_audio IN (0,1))",
+        "ALTER TABLE eventos ADD COLUMN req_salud INTEGER DEFAULT 0 CHECK (req_salud IN (0,1))",
+        "ALTER TABLE eventos ADD COLUMN deslinde_version TEXT DEFAULT 'v1_1'",
+        # DESLINDE PATCH: friendly intro flag
+        "ALTER TABLE eventos ADD COLUMN friendly_intro INTEGER DEFAULT 0 CHECK (friendly_intro IN (0,1))",
+        # deslinde_texto (custom per event)
+        "ALTER TABLE eventos ADD COLUMN deslinde_texto TEXT",
+        # aceptaciones: evidencias
+        "ALTER TABLE aceptaciones ADD COLUMN firma_path TEXT",
+        "ALTER TABLE aceptaciones ADD COLUMN doc_frente_path TEXT",
+        "ALTER TABLE aceptaciones ADD COLUMN doc_dorso_path TEXT",
+        "ALTER TABLE aceptaciones ADD COLUMN audio_path TEXT",
+        "ALTER TABLE aceptaciones ADD COLUMN salud_doc_path TEXT",
+        "ALTER TABLE aceptaciones ADD COLUMN salud_doc_tipo TEXT",
+        "ALTER TABLE aceptaciones ADD COLUMN audio_exento INTEGER DEFAULT 0 CHECK (audio_exento IN (0,1))",
+        "ALTER TABLE aceptaciones ADD COLUMN firma_asistida INTEGER DEFAULT 0 CHECK (firma_asistida IN (0,1))",
+        # aceptaciones: pdf_token + Stage A.2 - Control de tokens PDF
+        "ALTER TABLE aceptaciones ADD COLUMN pdf_token TEXT",
+        "ALTER TABLE aceptaciones ADD COLUMN pdf_token_expires_at TEXT",  # ISO UTC
+        "ALTER TABLE aceptaciones ADD COLUMN pdf_token_revoked INTEGER DEFAULT 0 CHECK (pdf_token_revoked IN (0,1))",
+        "ALTER TABLE aceptaciones ADD COLUMN pdf_last_access_at TEXT",  # ISO UTC
+        "ALTER TABLE aceptaciones ADD COLUMN pdf_access_count INTEGER DEFAULT 0",
+        # deslindes
+        "ALTER TABLE deslindes ADD COLUMN fecha_creacion TEXT",
+        "ALTER TABLE deslindes ADD COLUMN creado_por TEXT",
+    ],
+}
+
+
+def _backfill_documento_norm(cur, solo_nulos: bool) -> int:
+    """Completa documento_norm en lote (executemany). Retorna filas actualizadas."""
+    sql = "SELECT id, documento FROM aceptaciones WHERE documento IS NOT NULL"
+    if solo_nulos:
+        sql += " AND documento_norm IS NULL"
+    cur.execute(sql)
+    rows = cur.fetchall()
+    cur.executemany(
+        "UPDATE aceptaciones SET documento_norm = ? WHERE id = ?",
+        [(normalizar_documento_helper(r['documento']), r['id']) for r in rows],
+    )
+    return len(rows)
+
+
+def aplicar_migraciones_sqlite(cur, version_actual: int) -> None:
+    """Aplica los ALTER de las versiones posteriores a version_actual."""
+    for version in sorted(v for v in _SQLITE_MIGRACIONES if v > version_actual):
+        for ddl in _SQLITE_MIGRACIONES[version]:
+            try:
+                cur.execute(ddl)
+            except sqlite3.OperationalError:
+                pass  # Ya existe
+
+    # Migración: documento_norm para búsqueda optimizada
+    try:
+        cur.execute("ALTER TABLE aceptaciones ADD COLUMN documento_norm TEXT")
+        # Si se creó la columna, ejecutamos backfill inmediato
+        app_logger.info("Columna documento_norm creada. Iniciando backfill...")
+        count = _backfill_documento_norm(cur, solo_nulos=False)
+        app_logger.info("Backfill de documento_norm completado: %s registros actualizados.", count)
+    except sqlite3.OperationalError:
+        pass  # Ya existe: los nulos los corrige init_db en cada arranque
+
 
 def init_db() -> None:
     """
@@ -222,50 +383,6 @@ def init_db() -> None:
             """
         )
 
-        # Migración: req_firma en eventos
-        try:
-            cur.execute("ALTER TABLE eventos ADD COLUMN req_firma INTEGER DEFAULT 0 CHECK (req_firma IN (0,1))")
-        except sqlite3.OperationalError:
-            pass
-
-        # Migración: req_documento en eventos
-        try:
-            cur.execute("ALTER TABLE eventos ADD COLUMN req_documento INTEGER DEFAULT 0 CHECK (req_documento IN (0,1))")
-        except sqlite3.OperationalError:
-            pass
-
-        # Migración: req_audio en eventos
-        try:
-            cur.execute("ALTER TABLE eventos ADD COLUMN req_audio INTEGER DEFAULT 0 CHECK (req_audio IN (0,1))")
-        except sqlite3.OperationalError:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE eventos ADD COLUMN req_salud INTEGER DEFAULT 0 CHECK (req_salud IN (0,1))")
-        except sqlite3.OperationalError:
-            pass
-
-        # Migración: deslinde_version en eventos (v1_1 default)
-        try:
-            cur.execute("ALTER TABLE eventos ADD COLUMN deslinde_version TEXT DEFAULT 'v1_1'")
-        except sqlite3.OperationalError:
-            pass
-
-        # DESLINDE PATCH: friendly intro flag
-        # Migración: friendly_intro en eventos (default 0)
-        try:
-            cur.execute("ALTER TABLE eventos ADD COLUMN friendly_intro INTEGER DEFAULT 0 CHECK (friendly_intro IN (0,1))")
-        except sqlite3.OperationalError:
-            pass
-        # /DESLINDE PATCH
-
-        # TAREA: Migración deslinde_texto (custom per event)
-        try:
-            cur.execute("ALTER TABLE eventos ADD COLUMN deslinde_texto TEXT")
-        except sqlite3.OperationalError:
-            pass
-
-
         # Tabla de aceptaciones
         cur.execute(
             """
@@ -288,75 +405,6 @@ def init_db() -> None:
             """
         )
 
-        # Migración: firma_path en aceptaciones
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN firma_path TEXT")
-        except sqlite3.OperationalError:
-            pass
-
-        # Migración: doc_frente_path y doc_dorso_path en aceptaciones
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN doc_frente_path TEXT")
-        except sqlite3.OperationalError:
-            pass
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN doc_dorso_path TEXT")
-        except sqlite3.OperationalError:
-            pass
-
-        # Migración: audio_path en aceptaciones
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN audio_path TEXT")
-        except sqlite3.OperationalError:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN salud_doc_path TEXT")
-        except sqlite3.OperationalError:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN salud_doc_tipo TEXT")
-        except sqlite3.OperationalError:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN audio_exento INTEGER DEFAULT 0 CHECK (audio_exento IN (0,1))")
-        except sqlite3.OperationalError:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN firma_asistida INTEGER DEFAULT 0 CHECK (firma_asistida IN (0,1))")
-        except sqlite3.OperationalError:
-            pass
-
-        # Migración: pdf_token en aceptaciones
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN pdf_token TEXT")
-        except sqlite3.OperationalError:
-            pass
-
-        # Migración: Stage A.2 - Control de tokens PDF
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN pdf_token_expires_at TEXT")  # ISO UTC
-        except sqlite3.OperationalError:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN pdf_token_revoked INTEGER DEFAULT 0 CHECK (pdf_token_revoked IN (0,1))")
-        except sqlite3.OperationalError:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN pdf_last_access_at TEXT")  # ISO UTC
-        except sqlite3.OperationalError:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN pdf_access_count INTEGER DEFAULT 0")
-        except sqlite3.OperationalError:
-            pass
-
         # Tabla de deslindes versionados
         cur.execute(
             """
@@ -373,55 +421,6 @@ def init_db() -> None:
             """
         )
 
-        # Migración manual simple: intentar agregar columnas si no existen
-        try:
-            cur.execute("ALTER TABLE deslindes ADD COLUMN fecha_creacion TEXT")
-        except sqlite3.OperationalError:
-            pass  # Ya existe
-
-        try:
-            cur.execute("ALTER TABLE deslindes ADD COLUMN creado_por TEXT")
-        except sqlite3.OperationalError:
-            pass  # Ya existe
-
-        # Índice único parcial: un solo deslinde activo por evento
-        cur.execute(
-            """
-            CREATE UNIQUE INDEX IF NOT EXISTS idx_deslindes_evento_activo
-            ON deslindes(evento_id) WHERE activo = 1
-            """
-        )
-
-        # Migración: documento_norm para búsqueda optimizada
-        try:
-            cur.execute("ALTER TABLE aceptaciones ADD COLUMN documento_norm TEXT")
-            # Si se creó la columna, ejecutamos backfill inmediato
-            app_logger.info("Columna documento_norm creada. Iniciando backfill...")
-            cur.execute("SELECT id, documento FROM aceptaciones WHERE documento IS NOT NULL")
-            rows = cur.fetchall()
-            count = 0
-            for r in rows:
-                norm = normalizar_documento_helper(r['documento'])
-                cur.execute("UPDATE aceptaciones SET documento_norm = ? WHERE id = ?", (norm, r['id']))
-            app_logger.info(f"Backfill de documento_norm completado: {count} registros actualizados.")
-        except sqlite3.OperationalError:
-            # Si ya existe, verificamos si hay nulos para corregir (backfill perezoso)
-            cur.execute("SELECT COUNT(*) FROM aceptaciones WHERE documento_norm IS NULL AND documento IS NOT NULL")
-            if cur.fetchone()[0] > 0:
-                app_logger.info("Detectados registros sin documento_norm. Ejecutando backfill...")
-                cur.execute("SELECT id, documento FROM aceptaciones WHERE documento_norm IS NULL AND documento IS NOT NULL")
-                rows = cur.fetchall()
-                for r in rows:
-                    norm = normalizar_documento_helper(r['documento'])
-                    cur.execute("UPDATE aceptaciones SET documento_norm = ? WHERE id = ?", (norm, r['id']))
-
-        # Migración: indices para performance
-        try:
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_aceptaciones_evento ON aceptaciones(evento_id)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_aceptaciones_doc_norm ON aceptaciones(documento_norm)")
-        except sqlite3.OperationalError:
-            pass
-
         # Fase 1: historial de cambios
         cur.execute(
             """
@@ -436,10 +435,6 @@ def init_db() -> None:
             )
             """
         )
-        try:
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_historial_aceptacion ON aceptaciones_historial(aceptacion_id)")
-        except sqlite3.OperationalError:
-            pass
 
         # Tabla de operadores (acceso restringido por evento)
         cur.execute(
@@ -455,11 +450,49 @@ def init_db() -> None:
             """
         )
 
+        # Migraciones ALTER versionadas: solo corren si la base está atrasada
+        cur.execute("PRAGMA user_version")
+        version_actual = cur.fetchone()[0]
+        if version_actual < SQLITE_SCHEMA_VERSION:
+            aplicar_migraciones_sqlite(cur, version_actual)
+
+        # Índices (idempotentes, después de que existan todas las columnas)
+        cur.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_deslindes_evento_activo
+            ON deslindes(evento_id) WHERE activo = 1
+            """
+        )
+        # Incluye el rowid: WHERE evento_id = ? ORDER BY id DESC sale del índice sin ordenar.
+        # ORDER BY id DESC sin filtro ya recorre el rowid hacia atrás; no hace falta índice en id.
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_aceptaciones_evento ON aceptaciones(evento_id)")
+        # Monitores y exportación: WHERE evento_id = ? ORDER BY fecha_hora sin sort temporal
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_aceptaciones_evento_fecha "
+            "ON aceptaciones(evento_id, fecha_hora DESC, id)"
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_aceptaciones_doc_norm ON aceptaciones(documento_norm)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_historial_aceptacion ON aceptaciones_historial(aceptacion_id)")
+
+        # En cada arranque (fuera del versionado): filas con documento_norm NULL
+        # escritas por un binario viejo o a mano quedarían fuera de la búsqueda
+        # y del chequeo de duplicados. Con idx_aceptaciones_doc_norm es un probe barato.
+        count = _backfill_documento_norm(cur, solo_nulos=True)
+        if count:
+            app_logger.info("Backfill de documento_norm: %s registros sin normalizar corregidos.", count)
+
         conn.commit()
 
-        # Migraciones de columnas — deben correr DESPUÉS de los CREATE TABLE
+        # Migraciones de columnas — deben correr DESPUÉS de los CREATE TABLE.
+        # Chequean PRAGMA table_info (sin ALTER fallidos), por eso corren siempre.
         ensure_schema_migrations(conn)
 
+        if version_actual < SQLITE_SCHEMA_VERSION:
+            cur.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")
+            app_logger.info(
+                "Esquema SQLite actualizado: user_version %s -> %s", version_actual, SQLITE_SCHEMA_VERSION
+            )
+
     finally:
         conn.close()
 
@@ -469,6 +502,12 @@ def init_db() -> None:
 # ------------------------------------------------------------------------------
 app = FastAPI(title="EncarreraOK - MVP deslindes")
 
+# Rechazar bodies demasiado grandes por Content-Length, antes de leerlos
+app.add_middleware(
+    BodyLimitMiddleware,
+    max_bytes=int(public.MAX_REQUEST_BODY_MB * 1024 * 1024),
+)
+
 # STATIC PATCH: serve assets
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 app.mount(
@@ -489,12 +528,24 @@ app.include_router(operator.router)
 # ------------------------------------------------------------------------------
 # Hooks de arranque: inicializa base y crea un evento de ejemplo si vacío
 # ------------------------------------------------------------------------------
+@app.on_event("startup")
+async def configurar_threadpool() -> None:
+    """
+    Los handlers son sync: corren en el threadpool de anyio, cuyo tamaño limita
+    cuántos requests se atienden a la vez por worker. Se ajusta dentro del
+    event loop (el limitador es propio de cada loop).
+    """
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
+
 @app.on_event("startup")
 def on_startup() -> None:
     """
     Inicializa la base y, si no hay eventos, crea uno de ejemplo para pruebas.
+    También deja cargados en memoria los textos de deslinde.
     """
     init_db()
+    precargar_deslindes()
     conn = get_connection()
     try:
         cur = conn.cursor()